@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from pathlib import Path
+
 from aioesphomeapi import APIClient
 import voluptuous as vol
 
@@ -16,8 +18,20 @@ from homeassistant.const import (
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.typing import ConfigType
-
-from .const import CONF_BLUETOOTH_MAC_ADDRESS, CONF_NOISE_PSK, DATA_FFMPEG_PROXY, DOMAIN
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_BLUETOOTH_MAC_ADDRESS,
+    CONF_COALESCE_STATE_WRITES,
+    CONF_COALESCE_WINDOW,
+    CONF_NOISE_PSK,
+    CONF_RECORD_STATES,
+    DATA_FFMPEG_PROXY,
+    DEFAULT_COALESCE_STATE_WRITES,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_RECORD_STATES,
+    DOMAIN,
+)
 from .dashboard import async_setup as async_setup_dashboard
 from .domain_data import DomainData
 
@@ -25,6 +39,8 @@ from .domain_data import DomainData
 from .entry_data import ESPHomeConfigEntry, RuntimeEntryData
 from .ffmpeg_proxy import FFmpegProxyData, FFmpegProxyView
 from .manager import ESPHomeManager, cleanup_instance
+from .recording import RECORDINGS_DIR, StateRecorder, async_setup_services
+from .write_scheduler import StateWriteScheduler
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
@@ -45,6 +61,7 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     proxy_data = hass.data[DATA_FFMPEG_PROXY] = FFmpegProxyData()
 
     await async_setup_dashboard(hass)
+    async_setup_services(hass)
     hass.http.register_view(
         FFmpegProxyView(ffmpeg.get_ffmpeg_manager(hass), proxy_data)
     )
@@ -75,8 +92,20 @@ async def async_setup_entry(hass: HomeAssistant, entry: ESPHomeConfigEntry) -> b
         entry_id=entry.entry_id,
         title=entry.title,
         store=domain_data.get_or_create_store(hass, entry),
+        states_store=domain_data.get_or_create_states_store(hass, entry),
         original_options=dict(entry.options),
     )
+    if entry.options.get(CONF_COALESCE_STATE_WRITES, DEFAULT_COALESCE_STATE_WRITES):
+        entry_data.state_write_scheduler = StateWriteScheduler(
+            hass.loop,
+            entry.options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW) / 1000,
+        )
+    if entry.options.get(CONF_RECORD_STATES, DEFAULT_RECORD_STATES):
+        started = dt_util.utcnow().strftime("%Y%m%d%H%M%S")
+        entry_data.state_recorder = StateRecorder(
+            hass,
+            Path(hass.config.path(RECORDINGS_DIR, f"{entry.entry_id}-{started}.bin")),
+        )
     entry.runtime_data = entry_data
 
     manager = ESPHomeManager(
@@ -99,7 +128,9 @@ async def async_remove_entry(hass: HomeAssistant, entry: ESPHomeConfigEntry) ->
     """Remove an esphome config entry."""
     if bluetooth_mac_address := entry.data.get(CONF_BLUETOOTH_MAC_ADDRESS):
         async_remove_scanner(hass, bluetooth_mac_address.upper())
-    await DomainData.get(hass).get_or_create_store(hass, entry).async_remove()
+    domain_data = DomainData.get(hass)
+    await domain_data.get_or_create_store(hass, entry).async_remove()
+    await domain_data.get_or_create_states_store(hass, entry).async_remove()
 
 
 @callback
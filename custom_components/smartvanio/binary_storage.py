@@ -0,0 +1,182 @@
+"""Compact binary storage of the retained SmartVan.io entry data."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import logging
+from pathlib import Path
+from typing import Any, Final, cast
+
+import msgpack
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.util.file import write_utf8_file_atomic
+
+from .entry_data import ESPHomeStorage, StoreData
+
+_LOGGER = logging.getLogger(__name__)
+
+# Version of the layout of the stored data, bumped when StoreData changes
+# in a way older versions of the integration cannot read.
+BINARY_STORAGE_VERSION: Final = 1
+
+
+def binary_storage_path(hass: HomeAssistant, key: str) -> Path:
+    """Return the path of the binary file of a store key."""
+    return Path(hass.config.path(STORAGE_DIR, f"{key}.msgpack"))
+
+
+def _read_binary(path: Path) -> StoreData | None:
+    """Read and decode a binary file."""
+    try:
+        raw = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    try:
+        stored: dict[str, Any] = msgpack.unpackb(raw)
+    except (ValueError, msgpack.UnpackException) as err:
+        _LOGGER.error("Failed to decode %s: %s", path, err)
+        return None
+    if (version := stored.get("version")) != BINARY_STORAGE_VERSION:
+        _LOGGER.warning(
+            "Ignoring %s with unsupported storage version %s", path, version
+        )
+        return None
+    return cast(StoreData, stored["data"])
+
+
+class ESPHomeJSONStorage(ESPHomeStorage):
+    """JSON store taking over the data of the binary store.
+
+    Used when the binary_storage option is off. If the option was
+    turned off, the binary file is migrated on first load. Once the
+    JSON store holds the data, the binary file is removed.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, version: int, key: str, **kwargs: Any
+    ) -> None:
+        """Initialize the storage."""
+        super().__init__(hass, version, key, **kwargs)
+        self.binary_path = binary_storage_path(hass, key)
+
+    async def async_load(self) -> StoreData | None:
+        """Load the data, migrating it from the binary store if needed."""
+        if (data := await super().async_load()) is None and (
+            data := await self.hass.async_add_executor_job(
+                _read_binary, self.binary_path
+            )
+        ) is not None:
+            await self.async_save(data)
+        # The binary file is outdated once the JSON store holds the data
+        await self.hass.async_add_executor_job(self.binary_path.unlink, True)
+        return data
+
+    async def async_remove(self) -> None:
+        """Remove the JSON store and any binary file."""
+        await super().async_remove()
+        await self.hass.async_add_executor_job(self.binary_path.unlink, True)
+
+
+class ESPHomeBinaryStorage:
+    """Store the retained entry data as versioned msgpack.
+
+    Implements the parts of the Store API used by RuntimeEntryData. If
+    the binary_storage option was turned on, the data of the JSON store
+    is migrated on first load. Once the binary file holds the data, the
+    JSON store is removed.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, key: str, json_store: ESPHomeStorage
+    ) -> None:
+        """Initialize the storage."""
+        self.hass = hass
+        self.key = key
+        self.path = binary_storage_path(hass, key)
+        self._json_store = json_store
+        self._data_func: Callable[[], StoreData] | None = None
+        self._delay_handle: asyncio.TimerHandle | None = None
+        self._unsub_final_write: CALLBACK_TYPE | None = None
+
+    async def async_load(self) -> StoreData | None:
+        """Load the data, migrating it from the JSON store if needed."""
+        if (
+            data := await self.hass.async_add_executor_job(_read_binary, self.path)
+        ) is None and (data := await self._json_store.async_load()) is not None:
+            await self._async_write(data)
+        # The JSON store is outdated once the binary file holds the data
+        await self._json_store.async_remove()
+        return data
+
+    async def async_save(self, data: StoreData) -> None:
+        """Write the data now."""
+        self._async_cancel_delayed_save()
+        await self._async_write(data)
+
+    @callback
+    def async_delay_save(
+        self, data_func: Callable[[], StoreData], delay: float = 0
+    ) -> None:
+        """Write the data returned by data_func after a delay."""
+        self._data_func = data_func
+        if self._delay_handle is not None:
+            self._delay_handle.cancel()
+        self._delay_handle = self.hass.loop.call_later(
+            delay, self._async_handle_delayed_save
+        )
+        if self._unsub_final_write is None:
+            self._unsub_final_write = self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_handle_final_write
+            )
+
+    @callback
+    def _async_handle_delayed_save(self) -> None:
+        """Write the delayed data."""
+        self._delay_handle = None
+        if (data_func := self._data_func) is None:
+            return
+        self._data_func = None
+        self.hass.async_create_task(
+            self._async_write(data_func()), f"Save {self.key}", eager_start=True
+        )
+
+    async def _async_handle_final_write(self, _event: Event) -> None:
+        """Write pending data before Home Assistant stops."""
+        self._unsub_final_write = None
+        if self._delay_handle is not None:
+            self._delay_handle.cancel()
+            self._delay_handle = None
+        if (data_func := self._data_func) is not None:
+            self._data_func = None
+            await self._async_write(data_func())
+
+    @callback
+    def _async_cancel_delayed_save(self) -> None:
+        """Cancel a pending delayed write."""
+        self._data_func = None
+        if self._delay_handle is not None:
+            self._delay_handle.cancel()
+            self._delay_handle = None
+        if self._unsub_final_write is not None:
+            self._unsub_final_write()
+            self._unsub_final_write = None
+
+    async def _async_write(self, data: StoreData) -> None:
+        """Encode and write the data."""
+        encoded = msgpack.packb({"version": BINARY_STORAGE_VERSION, "data": data})
+        await self.hass.async_add_executor_job(self._write, encoded)
+
+    def _write(self, encoded: bytes) -> None:
+        """Write the encoded data atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_utf8_file_atomic(str(self.path), encoded, private=True, mode="wb")
+
+    async def async_remove(self) -> None:
+        """Remove the binary file and any JSON store."""
+        self._async_cancel_delayed_save()
+        await self.hass.async_add_executor_job(self.path.unlink, True)
+        await self._json_store.async_remove()
@@ -40,8 +40,10 @@ class EsphomeButton(EsphomeEntity[ButtonInfo, EntityState], ButtonEntity):
         update to ensure the button goes available and unavailable
         as the device becomes available or unavailable.
         """
+        was_available = self._attr_available
         self._on_entry_data_changed()
-        self.async_write_ha_state()
+        if self._attr_available != was_available:
+            self._async_schedule_write_ha_state()
 
     @convert_api_error_ha_error
     async def async_press(self) -> None:
@@ -38,13 +38,29 @@ from homeassistant.helpers.service_info.zeroconf import ZeroconfServiceInfo
 from homeassistant.util.json import json_loads_object
 
 from .const import (
+    CONF_ACCURACY_DEDUP,
     CONF_ALLOW_SERVICE_CALLS,
+    CONF_BINARY_STORAGE,
+    CONF_COALESCE_STATE_WRITES,
+    CONF_COALESCE_WINDOW,
     CONF_DEVICE_NAME,
+    CONF_INTERPOLATION_LOOKUP_TABLE,
     CONF_NOISE_PSK,
+    CONF_RECORD_STATES,
     CONF_SUBSCRIBE_LOGS,
+    CONF_UNAVAILABLE_GRACE_PERIOD,
+    DEFAULT_ACCURACY_DEDUP,
     DEFAULT_ALLOW_SERVICE_CALLS,
+    DEFAULT_BINARY_STORAGE,
+    DEFAULT_COALESCE_STATE_WRITES,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_INTERPOLATION_LOOKUP_TABLE,
     DEFAULT_NEW_CONFIG_ALLOW_ALLOW_SERVICE_CALLS,
+    DEFAULT_RECORD_STATES,
+    DEFAULT_UNAVAILABLE_GRACE_PERIOD,
     DOMAIN,
+    MAX_COALESCE_WINDOW,
+    MAX_UNAVAILABLE_GRACE_PERIOD,
 )
 from .dashboard import async_get_or_create_dashboard_manager, async_set_dashboard_info
 
@@ -513,6 +529,53 @@ class OptionsFlowHandler(OptionsFlow):
                     CONF_SUBSCRIBE_LOGS,
                     default=self.config_entry.options.get(CONF_SUBSCRIBE_LOGS, False),
                 ): bool,
+                vol.Required(
+                    CONF_INTERPOLATION_LOOKUP_TABLE,
+                    default=self.config_entry.options.get(
+                        CONF_INTERPOLATION_LOOKUP_TABLE,
+                        DEFAULT_INTERPOLATION_LOOKUP_TABLE,
+                    ),
+                ): bool,
+                vol.Required(
+                    CONF_COALESCE_STATE_WRITES,
+                    default=self.config_entry.options.get(
+                        CONF_COALESCE_STATE_WRITES, DEFAULT_COALESCE_STATE_WRITES
+                    ),
+                ): bool,
+                vol.Required(
+                    CONF_COALESCE_WINDOW,
+                    default=self.config_entry.options.get(
+                        CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_COALESCE_WINDOW)),
+                vol.Required(
+                    CONF_UNAVAILABLE_GRACE_PERIOD,
+                    default=self.config_entry.options.get(
+                        CONF_UNAVAILABLE_GRACE_PERIOD,
+                        DEFAULT_UNAVAILABLE_GRACE_PERIOD,
+                    ),
+                ): vol.All(
+                    vol.Coerce(float),
+                    vol.Range(min=0, max=MAX_UNAVAILABLE_GRACE_PERIOD),
+                ),
+                vol.Required(
+                    CONF_ACCURACY_DEDUP,
+                    default=self.config_entry.options.get(
+                        CONF_ACCURACY_DEDUP, DEFAULT_ACCURACY_DEDUP
+                    ),
+                ): bool,
+                vol.Required(
+                    CONF_RECORD_STATES,
+                    default=self.config_entry.options.get(
+                        CONF_RECORD_STATES, DEFAULT_RECORD_STATES
+                    ),
+                ): bool,
+                vol.Required(
+                    CONF_BINARY_STORAGE,
+                    default=self.config_entry.options.get(
+                        CONF_BINARY_STORAGE, DEFAULT_BINARY_STORAGE
+                    ),
+                ): bool,
             }
         )
         return self.async_show_form(step_id="init", data_schema=data_schema)
@@ -9,9 +9,25 @@ CONF_SUBSCRIBE_LOGS = "subscribe_logs"
 CONF_DEVICE_NAME = "device_name"
 CONF_NOISE_PSK = "noise_psk"
 CONF_BLUETOOTH_MAC_ADDRESS = "bluetooth_mac_address"
+CONF_INTERPOLATION_LOOKUP_TABLE = "interpolation_lookup_table"
+CONF_COALESCE_STATE_WRITES = "coalesce_state_writes"
+CONF_COALESCE_WINDOW = "coalesce_window"
+CONF_UNAVAILABLE_GRACE_PERIOD = "unavailable_grace_period"
+CONF_ACCURACY_DEDUP = "accuracy_dedup"
+CONF_RECORD_STATES = "record_states"
+CONF_BINARY_STORAGE = "binary_storage"
 
 DEFAULT_ALLOW_SERVICE_CALLS = True
 DEFAULT_NEW_CONFIG_ALLOW_ALLOW_SERVICE_CALLS = False
+DEFAULT_INTERPOLATION_LOOKUP_TABLE = False
+DEFAULT_COALESCE_STATE_WRITES = False
+DEFAULT_COALESCE_WINDOW = 0  # ms, 0 flushes on the next event loop iteration
+MAX_COALESCE_WINDOW = 100  # ms
+DEFAULT_UNAVAILABLE_GRACE_PERIOD = 0  # seconds
+DEFAULT_ACCURACY_DEDUP = False
+DEFAULT_RECORD_STATES = False
+DEFAULT_BINARY_STORAGE = False
+MAX_UNAVAILABLE_GRACE_PERIOD = 60  # seconds
 
 
 STABLE_BLE_VERSION_STR = "2025.2.2"
@@ -24,3 +40,27 @@ STABLE_BLE_URL_VERSION = f"{STABLE_BLE_VERSION.major}.{STABLE_BLE_VERSION.minor}
 DEFAULT_URL = f"https://esphome.io/changelog/{STABLE_BLE_URL_VERSION}.html"
 
 DATA_FFMPEG_PROXY = f"{DOMAIN}.ffmpeg_proxy"
+
+# Per sensor options stored in the entity registry under the DOMAIN key
+SERVICE_SET_SENSOR_OPTIONS = "set_sensor_options"
+CONF_DEADBAND = "deadband"
+CONF_DEADBAND_TYPE = "deadband_type"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_OUTLIER_THRESHOLD = "outlier_threshold"
+CONF_MEDIAN_WINDOW = "median_window"
+CONF_EMA_ALPHA = "ema_alpha"
+MAX_MEDIAN_WINDOW = 100
+DEADBAND_TYPE_ABSOLUTE = "absolute"
+DEADBAND_TYPE_PERCENT = "percent"
+
+# Replay of a state recording into a loaded config entry
+SERVICE_REPLAY_RECORDING = "replay_recording"
+ATTR_FILENAME = "filename"
+ATTR_SPEED = "speed"
+
+# Interpolated sensors are calculated from a raw sensor and the calibration
+# text and select entities which share the same object id prefix.
+INTERPOLATED_VALUE_SUFFIX = "_interpolated_value"
+RAW_SUFFIX = "_raw"
+INTERPOLATION_POINTS_SUFFIX = "_interpolation_points"
+INTERPOLATION_KIND_SUFFIX = "_interpolation_kind"
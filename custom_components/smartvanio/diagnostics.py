@@ -45,6 +45,8 @@ async def async_get_config_entry_diagnostics(
             "scanner": await scanner.async_diagnostics(),
         }
 
+    diag["dispatch_metrics"] = entry_data.dispatch_metrics.as_dict()
+
     if dashboard := async_get_dashboard(hass):
         diag["dashboard"] = dashboard.addon_slug
 
@@ -9,17 +9,25 @@ from typing import Self
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.json import JSONEncoder
 
-from .const import DOMAIN
-from .entry_data import ESPHomeConfigEntry, ESPHomeStorage, RuntimeEntryData
+from .binary_storage import ESPHomeBinaryStorage, ESPHomeJSONStorage
+from .const import CONF_BINARY_STORAGE, DEFAULT_BINARY_STORAGE, DOMAIN
+from .entry_data import (
+    ESPHomeConfigEntry,
+    ESPHomeStatesStorage,
+    ESPHomeStore,
+    RuntimeEntryData,
+)
 
 STORAGE_VERSION = 1
+STATES_STORAGE_VERSION = 1
 
 
 @dataclass(slots=True)
 class DomainData:
     """Define a class that stores global esphome data in hass.data[DOMAIN]."""
 
-    _stores: dict[str, ESPHomeStorage] = field(default_factory=dict)
+    _stores: dict[str, ESPHomeStore] = field(default_factory=dict)
+    _states_stores: dict[str, ESPHomeStatesStorage] = field(default_factory=dict)
 
     def get_entry_data(self, entry: ESPHomeConfigEntry) -> RuntimeEntryData:
         """Return the runtime entry data associated with this config entry.
@@ -30,14 +38,35 @@ class DomainData:
 
     def get_or_create_store(
         self, hass: HomeAssistant, entry: ESPHomeConfigEntry
-    ) -> ESPHomeStorage:
-        """Get or create a Store instance for the given config entry."""
-        return self._stores.setdefault(
-            entry.entry_id,
-            ESPHomeStorage(
-                hass, STORAGE_VERSION, f"smartvanio.{entry.entry_id}", encoder=JSONEncoder
-            ),
-        )
+    ) -> ESPHomeStore:
+        """Get or create a Store instance for the given config entry.
+
+        Each store migrates the data of the other format on first load,
+        so the binary_storage option can be turned on and off.
+        """
+        binary = entry.options.get(CONF_BINARY_STORAGE, DEFAULT_BINARY_STORAGE)
+        store = self._stores.get(entry.entry_id)
+        if store is not None and isinstance(store, ESPHomeBinaryStorage) == binary:
+            return store
+        key = f"smartvanio.{entry.entry_id}"
+        store = ESPHomeJSONStorage(hass, STORAGE_VERSION, key, encoder=JSONEncoder)
+        if binary:
+            store = ESPHomeBinaryStorage(hass, key, store)
+        self._stores[entry.entry_id] = store
+        return store
+
+    def get_or_create_states_store(
+        self, hass: HomeAssistant, entry: ESPHomeConfigEntry
+    ) -> ESPHomeStatesStorage:
+        """Get or create the Store of the last known states of a config entry."""
+        if (store := self._states_stores.get(entry.entry_id)) is None:
+            store = self._states_stores[entry.entry_id] = ESPHomeStatesStorage(
+                hass,
+                STATES_STORAGE_VERSION,
+                f"smartvanio.{entry.entry_id}.states",
+                encoder=JSONEncoder,
+            )
+        return store
 
     @classmethod
     @cache
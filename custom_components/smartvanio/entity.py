@@ -34,6 +34,7 @@ from .const import DOMAIN
 
 # Import config flow so that it's added to the registry
 from .entry_data import (
+    INFO_TO_COMPONENT_TYPE,
     DeviceEntityKey,
     ESPHomeConfigEntry,
     RuntimeEntryData,
@@ -61,10 +62,20 @@ def async_static_info_updated(
 ) -> None:
     """Update entities of this platform when entities are listed."""
     current_infos = entry_data.info[info_type]
+    if len(infos) == len(current_infos) and all(
+        current_infos.get((info.device_id, info.key)) == info for info in infos
+    ):
+        # Nothing was added, removed, moved or changed
+        return
     device_info = entry_data.device_info
     if TYPE_CHECKING:
         assert device_info is not None
     new_infos: dict[DeviceEntityKey, EntityInfo] = {}
+    # Secondary index of the device_ids each key is known under, used
+    # to find entities that moved to another device
+    device_ids_by_key: dict[int, list[int]] = {}
+    for existing_device_id, existing_key in current_infos:
+        device_ids_by_key.setdefault(existing_key, []).append(existing_device_id)
     add_entities: list[_EntityT] = []
 
     ent_reg = er.async_get(hass)
@@ -77,16 +88,14 @@ def async_static_info_updated(
         new_infos[info_key] = info
 
         # Try to find existing entity - first with current device_id
-        old_info = current_infos.pop(info_key, None)
+        if old_info := current_infos.pop(info_key, None):
+            device_ids_by_key[info.key].remove(info.device_id)
 
-        # If not found, search for entity with same key but different device_id
+        # If not found, look up an entity with same key but different device_id
         # This handles the case where entity moved between devices
-        if not old_info:
-            for existing_device_id, existing_key in list(current_infos):
-                if existing_key == info.key:
-                    # Found entity with same key but different device_id
-                    old_info = current_infos.pop((existing_device_id, existing_key))
-                    break
+        elif device_ids := device_ids_by_key.get(info.key):
+            # Found entity with same key but different device_id
+            old_info = current_infos.pop((device_ids.pop(0), info.key))
 
         # Create new entity if it doesn't exist
         if not old_info:
@@ -172,15 +181,39 @@ def async_static_info_updated(
 
     # Then update the actual info
     entry_data.info[info_type] = new_infos
+    entry_data.async_mark_storage_dirty(INFO_TO_COMPONENT_TYPE[info_type])
 
     if new_infos:
         entry_data.async_update_entity_infos(new_infos.values())
 
     if add_entities:
+        # Disabled entities are never added to Home Assistant, so the
+        # dispatcher can drop their states as soon as they arrive.
+        for entity in add_entities:
+            static_info = entity._static_info
+            entry_data.async_set_state_disabled(
+                state_type,
+                static_info.device_id,
+                static_info.key,
+                _is_entity_disabled(ent_reg, platform.domain, entity),
+            )
         # Add entities to Home Assistant
         async_add_entities(add_entities)
 
 
+def _is_entity_disabled(
+    ent_reg: er.EntityRegistry, domain: str, entity: EsphomeEntity[Any, Any]
+) -> bool:
+    """Return if the entity is, or will be registered as, disabled."""
+    assert entity.unique_id is not None
+    if (
+        entity_id := ent_reg.async_get_entity_id(domain, DOMAIN, entity.unique_id)
+    ) is None:
+        return not entity.entity_registry_enabled_default
+    registry_entry = ent_reg.async_get(entity_id)
+    return registry_entry is not None and registry_entry.disabled
+
+
 async def platform_async_setup_entry(
     hass: HomeAssistant,
     entry: ESPHomeConfigEntry,
@@ -324,6 +357,7 @@ class EsphomeEntity(EsphomeBaseEntity, Generic[_InfoT, _StateT]):
     _static_info: _InfoT
     _state: _StateT
     _has_state: bool = False
+    _state_slot: int
     unique_id: str
 
     def __init__(
@@ -335,7 +369,6 @@ class EsphomeEntity(EsphomeBaseEntity, Generic[_InfoT, _StateT]):
     ) -> None:
         """Initialize."""
         self._entry_data = entry_data
-        self._states = cast(dict[int, _StateT], entry_data.state[state_type])
         assert entry_data.device_info is not None
         device_info = entry_data.device_info
         self._on_entry_data_changed()
@@ -404,6 +437,10 @@ class EsphomeEntity(EsphomeBaseEntity, Generic[_InfoT, _StateT]):
                 self._on_removal_signal,
             )
         )
+        if (scheduler := entry_data.state_write_scheduler) is not None:
+            self.async_on_remove(
+                functools.partial(scheduler.async_discard, self.async_write_ha_state)
+            )
         self._update_state_from_entry_data()
 
     @callback
@@ -429,6 +466,9 @@ class EsphomeEntity(EsphomeBaseEntity, Generic[_InfoT, _StateT]):
             static_info = cast(_InfoT, static_info)
             assert device_info
         self._static_info = static_info
+        self._state_slot = self._entry_data.async_get_state_slot(
+            self._state_type, static_info.device_id, static_info.key
+        )
         self._attr_unique_id = build_device_unique_id(
             device_info.mac_address, static_info
         )
@@ -451,9 +491,9 @@ class EsphomeEntity(EsphomeBaseEntity, Generic[_InfoT, _StateT]):
     @callback
     def _update_state_from_entry_data(self) -> None:
         """Update state from entry data."""
-        key = self._key
-        if has_state := key in self._states:
-            self._state = self._states[key]
+        state = self._entry_data.state_slots[self._state_slot].state
+        if has_state := state is not None:
+            self._state = cast(_StateT, state)
         self._has_state = has_state
 
     @callback
@@ -463,7 +503,15 @@ class EsphomeEntity(EsphomeBaseEntity, Generic[_InfoT, _StateT]):
         Behavior can be changed in child classes
         """
         self._update_state_from_entry_data()
-        self.async_write_ha_state()
+        self._async_schedule_write_ha_state()
+
+    @callback
+    def _async_schedule_write_ha_state(self) -> None:
+        """Write the state now or on the next flush when writes are coalesced."""
+        if (scheduler := self._entry_data.state_write_scheduler) is None:
+            self.async_write_ha_state()
+            return
+        scheduler.async_schedule(self.async_write_ha_state)
 
     @callback
     def _on_entry_data_changed(self) -> None:
@@ -480,18 +528,27 @@ class EsphomeEntity(EsphomeBaseEntity, Generic[_InfoT, _StateT]):
             # For these cases, show it as available
             self._attr_available = entry_data.expected_disconnect
         else:
-            self._attr_available = entry_data.available
+            # Restored states are shown as available until the first
+            # connection fails or the unavailable grace period ends.
+            self._attr_available = (
+                entry_data.available or entry_data.restored_states_available
+            )
 
     @callback
     def _on_device_update(self) -> None:
         """Call when device updates or entry data changes."""
+        was_available = self._attr_available
         self._on_entry_data_changed()
-        if not self._entry_data.available:
+        if not self._entry_data.available and self._attr_available != was_available:
             # Only write state if the device has gone unavailable
             # since _on_state_update will be called if the device
             # is available when the full state arrives
-            # through the next entity state packet.
-            self.async_write_ha_state()
+            # through the next entity state packet. Entities whose
+            # availability did not change have nothing to write.
+            if not self._entry_data.async_schedule_device_state_write(
+                self.async_write_ha_state
+            ):
+                self._async_schedule_write_ha_state()
 
 
 class EsphomeAssistEntity(EsphomeBaseEntity):
@@ -8,8 +8,9 @@ from collections.abc import Callable, Iterable
 from dataclasses import dataclass, field
 from functools import partial
 import logging
-from operator import delitem
-from typing import TYPE_CHECKING, Any, Final, TypedDict, cast
+import math
+import time
+from typing import TYPE_CHECKING, Any, Final, NamedTuple, TypedDict, cast
 
 from aioesphomeapi import (
     COMPONENT_TYPE_TO_INFO,
@@ -40,6 +41,7 @@ from aioesphomeapi import (
     SwitchInfo,
     TextInfo,
     TextSensorInfo,
+    TextState,
     TimeInfo,
     UpdateInfo,
     UserService,
@@ -56,18 +58,48 @@ from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN
+from .const import (
+    CONF_ACCURACY_DEDUP,
+    DEFAULT_ACCURACY_DEDUP,
+    DOMAIN,
+    INTERPOLATED_VALUE_SUFFIX,
+    INTERPOLATION_KIND_SUFFIX,
+    INTERPOLATION_POINTS_SUFFIX,
+    RAW_SUFFIX,
+)
 from .dashboard import async_get_dashboard
+from .interpolation import (
+    VECTORIZE_MIN_SIZE,
+    CalibrationPoints,
+    InterpolationModel,
+    InterpolationModelKey,
+    Interpolator,
+    InvalidInterpolationPoints,
+    build_interpolation_model,
+    parse_interpolation_points,
+)
+from .metrics import DispatchMetrics, StateTypeCounters
+from .recording import StateRecorder, state_from_dict, state_to_dict
+from .write_scheduler import StateWriteScheduler
+
+if TYPE_CHECKING:
+    from .binary_storage import ESPHomeBinaryStorage
 
 type ESPHomeConfigEntry = ConfigEntry[RuntimeEntryData]
 type EntityStateKey = tuple[type[EntityState], int, int]  # (state_type, device_id, key)
 type EntityInfoKey = tuple[type[EntityInfo], int, int]  # (info_type, device_id, key)
 type DeviceEntityKey = tuple[int, int]  # (device_id, key)
+# Called with the model key, raw value and result of a queued interpolation
+type InterpolationCallback = Callable[[InterpolationModelKey, float, float], None]
 
 INFO_TO_COMPONENT_TYPE: Final = {v: k for k, v in COMPONENT_TYPE_TO_INFO.items()}
 
-_SENTINEL = object()
 SAVE_DELAY = 120
+# The states change all the time, so like the states of RestoreEntity
+# they are only written every 15 minutes and when Home Assistant stops.
+STATES_SAVE_DELAY = 900
+# Calibration curves whose interpolation models are kept per entry
+MAX_INTERPOLATION_MODELS = 32
 _LOGGER = logging.getLogger(__name__)
 
 # Mapping from ESPHome info type to HA platform
@@ -113,6 +145,93 @@ def build_device_unique_id(mac: str, entity_info: EntityInfo) -> str:
     return base_unique_id
 
 
+class CalibrationKeys(NamedTuple):
+    """Keys of the entities an interpolated sensor derives its value from.
+
+    All keys belong to the same device_id as the interpolated sensor.
+    """
+
+    raw_key: int
+    points_key: int
+    kind_key: int
+
+
+# States that are dispatched even when they are identical to the
+# previous state, keyed by the info type of their entities.
+_ALWAYS_DISPATCH_STATE_TYPES: Final[dict[type[EntityInfo], type[EntityState]]] = {
+    CameraInfo: CameraState,
+    EventInfo: Event,
+}
+
+_CALIBRATION_SIBLING_SUFFIXES: Final = (
+    (SensorInfo, RAW_SUFFIX),
+    (TextInfo, INTERPOLATION_POINTS_SUFFIX),
+    (SelectInfo, INTERPOLATION_KIND_SUFFIX),
+)
+
+
+class EntityStateSlot:
+    """Latest state of an entity and the callbacks to notify when it changes."""
+
+    __slots__ = (
+        "accuracy_decimals",
+        "always_dispatch",
+        "counters",
+        "derived_subscriptions",
+        "disabled",
+        "filters",
+        "generation",
+        "state",
+        "subscription",
+    )
+
+    def __init__(
+        self,
+        counters: StateTypeCounters,
+        always_dispatch: bool = False,
+        accuracy_decimals: int | None = None,
+    ) -> None:
+        """Initialize the slot."""
+        self.state: EntityState | None = None
+        # Dispatch counters shared by all slots of the same state type
+        self.counters = counters
+        self.subscription: CALLBACK_TYPE | None = None
+        # Entities that derive their state from other entities, such as
+        # interpolated sensors, subscribe to their source states here.
+        self.derived_subscriptions: list[CALLBACK_TYPE] = []
+        # Camera images, events and force_update sensors are
+        # dispatched even if the state did not change.
+        self.always_dispatch = always_dispatch
+        # Decimals numeric sensor states are compared at, or None to
+        # only drop states that are exactly equal.
+        self.accuracy_decimals = accuracy_decimals
+        # Set for entities disabled in the entity registry, whose states
+        # are dropped unless another entity derives its state from them.
+        self.disabled = False
+        # Number of smoothing filter chains sampling this state. They
+        # need every sample, including repeats of the same value, so
+        # these states are never deduplicated.
+        self.filters = 0
+        # Connection generation the state was last dispatched in. The
+        # first update after reconnecting is always dispatched.
+        self.generation = -1
+
+
+def _equal_at_accuracy(
+    previous: EntityState | None, state: EntityState, decimals: int
+) -> bool:
+    """Return if two sensor states are equal when rounded to the decimals."""
+    if previous is None or previous.missing_state != state.missing_state:
+        return False
+    previous_value = cast(SensorState, previous).state
+    value = cast(SensorState, state).state
+    return (
+        math.isfinite(previous_value)
+        and math.isfinite(value)
+        and round(previous_value, decimals) == round(value, decimals)
+    )
+
+
 class StoreData(TypedDict, total=False):
     """ESPHome storage data."""
 
@@ -125,6 +244,19 @@ class ESPHomeStorage(Store[StoreData]):
     """ESPHome Storage."""
 
 
+class StatesStoreData(TypedDict):
+    """Last known entity states."""
+
+    states: list[dict[str, Any]]
+
+
+class ESPHomeStatesStorage(Store[StatesStoreData]):
+    """Storage of the last known entity states."""
+
+
+type ESPHomeStore = ESPHomeStorage | ESPHomeBinaryStorage
+
+
 @dataclass(slots=True)
 class RuntimeEntryData:
     """Store runtime data for esphome config entries."""
@@ -132,14 +264,26 @@ class RuntimeEntryData:
     entry_id: str
     title: str
     client: APIClient
-    store: ESPHomeStorage
-    state: defaultdict[type[EntityState], dict[int, EntityState]] = field(
-        default_factory=lambda: defaultdict(dict)
-    )
-    # When the disconnect callback is called, we mark all states
-    # as stale so we will always dispatch a state update when the
-    # device reconnects. This is the same format as state_subscriptions.
-    stale_state: set[EntityStateKey] = field(default_factory=set)
+    store: ESPHomeStore
+    states_store: ESPHomeStatesStorage
+    # States are kept in slots assigned once per (state_type, device_id,
+    # key) so sub-devices with overlapping keys do not overwrite each
+    # other, and entities can reach their state by index.
+    state_slots: list[EntityStateSlot] = field(default_factory=list)
+    state_slot_index: dict[EntityStateKey, int] = field(default_factory=dict)
+    # Incremented on every disconnect so all stored states are stale
+    connection_generation: int = 0
+    dispatch_metrics: DispatchMetrics = field(default_factory=DispatchMetrics)
+    # The entity infos last distributed to the platforms
+    static_infos: list[EntityInfo] = field(default_factory=list)
+    # Pending transition of the entities to unavailable after a disconnect
+    _unavailable_timer: asyncio.TimerHandle | None = None
+    # Subscription keys of camera images, events and force_update
+    # sensors which are dispatched even if the state did not change.
+    always_dispatch: frozenset[EntityStateKey] = frozenset()
+    # Accuracy of the sensors whose states are deduplicated after
+    # rounding, only populated when the accuracy_dedup option is set.
+    accuracy_decimals: dict[EntityStateKey, int] = field(default_factory=dict)
     info: dict[type[EntityInfo], dict[DeviceEntityKey, EntityInfo]] = field(
         default_factory=dict
     )
@@ -151,9 +295,6 @@ class RuntimeEntryData:
     api_version: APIVersion = field(default_factory=APIVersion)
     cleanup_callbacks: list[CALLBACK_TYPE] = field(default_factory=list)
     disconnect_callbacks: set[CALLBACK_TYPE] = field(default_factory=set)
-    state_subscriptions: dict[EntityStateKey, CALLBACK_TYPE] = field(
-        default_factory=dict
-    )
     device_update_subscriptions: set[CALLBACK_TYPE] = field(default_factory=set)
     static_info_update_subscriptions: set[Callable[[list[EntityInfo]], None]] = field(
         default_factory=set
@@ -162,6 +303,16 @@ class RuntimeEntryData:
     platform_load_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
     _storage_contents: StoreData | None = None
     _pending_storage: Callable[[], StoreData] | None = None
+    # Sections of the stored data that changed since they were last built,
+    # keyed like StoreData: component types, "services" and so on.
+    _dirty_storage_sections: set[str] = field(default_factory=set)
+    _stored_device_info: DeviceInfo | None = None
+    _stored_api_version: APIVersion | None = None
+    # The state snapshot is taken when the pending save is written
+    _states_dirty: bool = False
+    # Set while the entities show the restored states before the first
+    # connection, until it fails or the unavailable grace period ends.
+    restored_states_available: bool = False
     assist_pipeline_update_callbacks: list[CALLBACK_TYPE] = field(default_factory=list)
     assist_pipeline_state: bool = False
     entity_info_callbacks: dict[
@@ -181,9 +332,44 @@ class RuntimeEntryData:
         default_factory=list
     )
     device_id_to_name: dict[int, str] = field(default_factory=dict)
+    # Maps the (device_id, key) of each interpolated sensor to the keys
+    # of its raw sensor and calibration entities.
+    calibration_index: dict[DeviceEntityKey, CalibrationKeys] = field(
+        default_factory=dict
+    )
+    # Parsed interpolation points along with the TextState they were
+    # parsed from, so each new text value is only parsed once.
+    interpolation_points: dict[
+        DeviceEntityKey, tuple[EntityState, CalibrationPoints | None]
+    ] = field(default_factory=dict)
     entity_removal_callbacks: dict[EntityInfoKey, list[CALLBACK_TYPE]] = field(
         default_factory=dict
     )
+    # Interpolation models shared by all sensors on the same calibration
+    # curve, and the executor builds of the expensive ones.
+    interpolation_models: dict[InterpolationModelKey, InterpolationModel | None] = (
+        field(default_factory=dict)
+    )
+    _interpolation_model_builds: dict[
+        InterpolationModelKey, asyncio.Task[InterpolationModel | None]
+    ] = field(default_factory=dict)
+    # Number of sensors currently using each interpolation model
+    _interpolation_model_users: dict[InterpolationModelKey, int] = field(
+        default_factory=dict
+    )
+    # Raw values waiting to be interpolated at the end of the current
+    # event loop iteration, grouped by the calibration curve to use.
+    _pending_interpolations: dict[
+        InterpolationModelKey,
+        tuple[Interpolator, dict[InterpolationCallback, float]],
+    ] = field(default_factory=dict)
+    _interpolation_flush: asyncio.Handle | None = None
+    # Set when state writes of entities are coalesced per flush
+    state_write_scheduler: StateWriteScheduler | None = None
+    # State writes collected while a device state update is distributed
+    _device_state_writes: dict[CALLBACK_TYPE, None] | None = None
+    # Set when incoming states are recorded for replay
+    state_recorder: StateRecorder | None = None
 
     @property
     def name(self) -> str:
@@ -262,6 +448,244 @@ class RuntimeEntryData:
             ):
                 callback_(static_info)
 
+    @callback
+    def async_update_always_dispatch(self, infos: Iterable[EntityInfo]) -> None:
+        """Rebuild the keys of states dispatched even when unchanged."""
+        always_dispatch: set[EntityStateKey] = set()
+        for info in infos:
+            info_type = type(info)
+            if state_type := _ALWAYS_DISPATCH_STATE_TYPES.get(info_type):
+                always_dispatch.add((state_type, info.device_id, info.key))
+            elif info_type is SensorInfo and cast(SensorInfo, info).force_update:
+                always_dispatch.add((SensorState, info.device_id, info.key))
+        self.always_dispatch = frozenset(always_dispatch)
+        slots = self.state_slots
+        for subscription_key, index in self.state_slot_index.items():
+            slots[index].always_dispatch = subscription_key in always_dispatch
+
+    @callback
+    def async_update_accuracy_decimals(self, infos: Iterable[EntityInfo]) -> None:
+        """Rebuild the accuracy numeric sensor states are deduplicated at."""
+        if not self.original_options.get(CONF_ACCURACY_DEDUP, DEFAULT_ACCURACY_DEDUP):
+            return
+        accuracy_decimals: dict[EntityStateKey, int] = {}
+        for info in infos:
+            if type(info) is SensorInfo:
+                subscription_key = (SensorState, info.device_id, info.key)
+                accuracy_decimals[subscription_key] = info.accuracy_decimals
+        self.accuracy_decimals = accuracy_decimals
+        slots = self.state_slots
+        for subscription_key, index in self.state_slot_index.items():
+            slots[index].accuracy_decimals = accuracy_decimals.get(subscription_key)
+
+    @callback
+    def async_update_calibration_index(self, infos: Iterable[EntityInfo]) -> None:
+        """Index interpolated sensors by the entities they are calculated from."""
+        sibling_keys: dict[tuple[type[EntityInfo], int, str], int] = {}
+        interpolated_infos: list[EntityInfo] = []
+        for info in infos:
+            info_type = type(info)
+            if info_type is SensorInfo and info.object_id.endswith(
+                INTERPOLATED_VALUE_SUFFIX
+            ):
+                interpolated_infos.append(info)
+            elif info_type in (SensorInfo, TextInfo, SelectInfo):
+                sibling_keys[(info_type, info.device_id, info.object_id)] = info.key
+
+        calibration_index: dict[DeviceEntityKey, CalibrationKeys] = {}
+        for info in interpolated_infos:
+            base_object_id = info.object_id.removesuffix(INTERPOLATED_VALUE_SUFFIX)
+            keys: list[int] = []
+            for info_type, suffix in _CALIBRATION_SIBLING_SUFFIXES:
+                if (
+                    key := sibling_keys.get(
+                        (info_type, info.device_id, f"{base_object_id}{suffix}")
+                    )
+                ) is None:
+                    _LOGGER.debug(
+                        "%s: Missing %s%s entity for interpolated sensor %s",
+                        self.name,
+                        base_object_id,
+                        suffix,
+                        info.object_id,
+                    )
+                    break
+                keys.append(key)
+            else:
+                calibration_index[(info.device_id, info.key)] = CalibrationKeys(*keys)
+        self.calibration_index = calibration_index
+
+    @callback
+    def async_get_interpolation_points(
+        self, device_id: int, key: int
+    ) -> CalibrationPoints | None:
+        """Return the parsed points of an interpolation points text entity.
+
+        Returns None if the text has no state or is not a valid
+        calibration table.
+        """
+        if (
+            state := self.async_get_state(TextState, device_id, key)
+        ) is None or state.missing_state:
+            return None
+        points_key = (device_id, key)
+        parsed = self.interpolation_points.get(points_key)
+        if parsed is not None and parsed[0] is state:
+            return parsed[1]
+        points: CalibrationPoints | None = None
+        try:
+            points = parse_interpolation_points(cast(TextState, state).state)
+        except InvalidInterpolationPoints as err:
+            _LOGGER.warning(
+                "%s: Ignoring invalid interpolation points %s: %s",
+                self.name,
+                cast(TextState, state).state,
+                err,
+            )
+        self.interpolation_points[points_key] = (state, points)
+        return points
+
+    @callback
+    def async_get_interpolation_model(
+        self, model_key: InterpolationModelKey
+    ) -> InterpolationModel | None:
+        """Return the shared model of a calibration curve, building it if needed.
+
+        Only use this for models that are cheap to build, the others are
+        built in the executor by async_build_interpolation_model.
+        """
+        if model_key in self.interpolation_models:
+            return self.interpolation_models[model_key]
+        model: InterpolationModel | None = None
+        try:
+            model = build_interpolation_model(*model_key)
+        except Exception:
+            _LOGGER.exception("%s: Failed to build interpolation model", self.name)
+        self._async_cache_interpolation_model(model_key, model)
+        return model
+
+    async def async_build_interpolation_model(
+        self, hass: HomeAssistant, model_key: InterpolationModelKey
+    ) -> InterpolationModel | None:
+        """Return the shared model of a calibration curve, building it in the executor.
+
+        All sensors on the same curve wait for the same build.
+        """
+        if model_key in self.interpolation_models:
+            return self.interpolation_models[model_key]
+        if (build := self._interpolation_model_builds.get(model_key)) is None:
+            build = self._interpolation_model_builds[model_key] = (
+                hass.async_create_background_task(
+                    self._async_build_interpolation_model(hass, model_key),
+                    f"{self.name} interpolation model",
+                )
+            )
+        # A sensor giving up on the model must not cancel the shared build
+        return await asyncio.shield(build)
+
+    async def _async_build_interpolation_model(
+        self, hass: HomeAssistant, model_key: InterpolationModelKey
+    ) -> InterpolationModel | None:
+        """Build a model in the executor and cache it."""
+        model: InterpolationModel | None = None
+        try:
+            model = await hass.async_add_executor_job(
+                build_interpolation_model, *model_key
+            )
+        except Exception:
+            _LOGGER.exception("%s: Failed to build interpolation model", self.name)
+        del self._interpolation_model_builds[model_key]
+        self._async_cache_interpolation_model(model_key, model)
+        return model
+
+    @callback
+    def _async_cache_interpolation_model(
+        self, model_key: InterpolationModelKey, model: InterpolationModel | None
+    ) -> None:
+        """Cache a model, dropping the oldest unused one once there are too many."""
+        models = self.interpolation_models
+        models[model_key] = model
+        if len(models) <= MAX_INTERPOLATION_MODELS:
+            return
+        users = self._interpolation_model_users
+        # Sensors keep a reference to the model they currently use
+        del models[
+            next((key for key in models if key not in users), next(iter(models)))
+        ]
+
+    @callback
+    def async_use_interpolation_model(
+        self, model_key: InterpolationModelKey
+    ) -> CALLBACK_TYPE:
+        """Count a sensor as using a model until the returned callback is called."""
+        users = self._interpolation_model_users
+        users[model_key] = users.get(model_key, 0) + 1
+        return partial(self._async_release_interpolation_model, model_key)
+
+    @callback
+    def _async_release_interpolation_model(
+        self, model_key: InterpolationModelKey
+    ) -> None:
+        """Stop counting a sensor as using a model."""
+        users = self._interpolation_model_users
+        if (count := users[model_key] - 1) > 0:
+            users[model_key] = count
+        else:
+            del users[model_key]
+
+    @callback
+    def async_is_interpolation_batched(self, model_key: InterpolationModelKey) -> bool:
+        """Return if values of a model are worth queueing for a vectorized batch.
+
+        Curves shared by fewer sensors than a vectorized batch needs are
+        evaluated right away instead.
+        """
+        return self._interpolation_model_users.get(model_key, 0) >= VECTORIZE_MIN_SIZE
+
+    @callback
+    def async_schedule_interpolation(
+        self,
+        model_key: InterpolationModelKey,
+        interpolator: Interpolator,
+        raw_value: float,
+        result_callback: InterpolationCallback,
+    ) -> None:
+        """Queue a raw value to be interpolated with the other updates of this tick.
+
+        All values queued for the same calibration curve are evaluated
+        together, so bursts of updates of sensors sharing a curve can be
+        vectorized. Only the latest value queued by each callback is
+        interpolated.
+        """
+        if (pending := self._pending_interpolations.get(model_key)) is None:
+            pending = self._pending_interpolations[model_key] = (interpolator, {})
+        pending[1][result_callback] = raw_value
+        if self._interpolation_flush is None:
+            self._interpolation_flush = asyncio.get_running_loop().call_soon(
+                self._async_flush_interpolations
+            )
+
+    @callback
+    def _async_flush_interpolations(self) -> None:
+        """Interpolate all queued raw values and dispatch the results."""
+        self._interpolation_flush = None
+        pending = self._pending_interpolations
+        self._pending_interpolations = {}
+        for model_key, (interpolator, requests) in pending.items():
+            raw_values = list(requests.values())
+            try:
+                results = interpolator.sample(raw_values)
+            except Exception:
+                _LOGGER.exception("Error while interpolating sensor values")
+                continue
+            for (result_callback, raw_value), result in zip(
+                requests.items(), results, strict=True
+            ):
+                try:
+                    result_callback(model_key, raw_value, result)
+                except Exception:
+                    _LOGGER.exception("Error while calling interpolation callback")
+
     async def _ensure_platforms_loaded(
         self,
         hass: HomeAssistant,
@@ -296,8 +720,22 @@ class RuntimeEntryData:
                 needed_platforms.add(Platform.SELECT)
 
         needed_platforms.update(INFO_TYPE_TO_PLATFORM[type(info)] for info in infos)
+        loaded_platforms = set(self.loaded_platforms)
         await self._ensure_platforms_loaded(hass, entry, needed_platforms)
 
+        # Reconnects without a firmware change list the same entities,
+        # so there is nothing to redistribute unless a platform was just
+        # loaded and has not seen the infos yet.
+        if self.loaded_platforms == loaded_platforms and infos == self.static_infos:
+            return
+        self.static_infos = infos
+
+        # Index the calibration entities before the entities are
+        # updated so interpolated sensors can resolve their sources.
+        self.async_update_calibration_index(infos)
+        self.async_update_always_dispatch(infos)
+        self.async_update_accuracy_decimals(infos)
+
         # Make a dict of the EntityInfo by type and send
         # them to the listeners for each specific EntityInfo type
         infos_by_type: defaultdict[type[EntityInfo], list[EntityInfo]] = defaultdict(
@@ -332,6 +770,75 @@ class RuntimeEntryData:
         self.static_info_update_subscriptions.add(callback_)
         return partial(self.static_info_update_subscriptions.remove, callback_)
 
+    @callback
+    def async_get_state_slot(
+        self, state_type: type[EntityState], device_id: int, state_key: int
+    ) -> int:
+        """Return the index of the state slot, assigning one if needed."""
+        subscription_key = (state_type, device_id, state_key)
+        if (index := self.state_slot_index.get(subscription_key)) is None:
+            index = self.state_slot_index[subscription_key] = len(self.state_slots)
+            self.state_slots.append(
+                EntityStateSlot(
+                    self.dispatch_metrics.counters(state_type),
+                    subscription_key in self.always_dispatch,
+                    self.accuracy_decimals.get(subscription_key),
+                )
+            )
+        return index
+
+    @callback
+    def async_get_state(
+        self, state_type: type[EntityState], device_id: int, state_key: int
+    ) -> EntityState | None:
+        """Return the latest state of an entity or None if it has none."""
+        if (
+            index := self.state_slot_index.get((state_type, device_id, state_key))
+        ) is None:
+            return None
+        return self.state_slots[index].state
+
+    @callback
+    def async_set_state_disabled(
+        self,
+        state_type: type[EntityState],
+        device_id: int,
+        state_key: int,
+        disabled: bool,
+    ) -> None:
+        """Set if the states of an entity are dropped because it is disabled."""
+        slot = self.state_slots[
+            self.async_get_state_slot(state_type, device_id, state_key)
+        ]
+        slot.disabled = disabled
+        if disabled and not slot.derived_subscriptions:
+            slot.state = None
+
+    @callback
+    def async_subscribe_state_filter(
+        self, state_type: type[EntityState], device_id: int, state_key: int
+    ) -> CALLBACK_TYPE:
+        """Dispatch every update of a state sampled by smoothing filters."""
+        slot = self.state_slots[
+            self.async_get_state_slot(state_type, device_id, state_key)
+        ]
+        slot.filters += 1
+        return partial(self._async_unsubscribe_state_filter, slot)
+
+    @callback
+    def _async_unsubscribe_state_filter(self, slot: EntityStateSlot) -> None:
+        """Unsubscribe smoothing filters from a state."""
+        slot.filters -= 1
+
+    @callback
+    def async_mark_states_stale(self) -> None:
+        """Always dispatch the next update of each state.
+
+        Starting a new connection generation invalidates every stored
+        state at once without touching the slots.
+        """
+        self.connection_generation += 1
+
     @callback
     def async_subscribe_state_update(
         self,
@@ -341,47 +848,163 @@ class RuntimeEntryData:
         entity_callback: CALLBACK_TYPE,
     ) -> CALLBACK_TYPE:
         """Subscribe to state updates."""
-        subscription_key = (state_type, device_id, state_key)
-        self.state_subscriptions[subscription_key] = entity_callback
-        return partial(delitem, self.state_subscriptions, subscription_key)
-
-    @callback
-    def async_update_state(self, state: EntityState) -> None:
-        """Distribute an update of state information to the target."""
-        key = state.key
-        state_type = type(state)
-        stale_state = self.stale_state
-        current_state_by_type = self.state[state_type]
-        current_state = current_state_by_type.get(key, _SENTINEL)
-        subscription_key = (state_type, state.device_id, key)
+        slot = self.state_slots[
+            self.async_get_state_slot(state_type, device_id, state_key)
+        ]
+        slot.subscription = entity_callback
+        return partial(self._async_unsubscribe_state_update, slot, entity_callback)
+
+    @callback
+    def _async_unsubscribe_state_update(
+        self, slot: EntityStateSlot, entity_callback: CALLBACK_TYPE
+    ) -> None:
+        """Unsubscribe from state updates."""
+        if slot.subscription is entity_callback:
+            slot.subscription = None
+
+    @callback
+    def async_subscribe_derived_state_update(
+        self,
+        device_id: int,
+        state_type: type[EntityState],
+        state_key: int,
+        entity_callback: CALLBACK_TYPE,
+    ) -> CALLBACK_TYPE:
+        """Subscribe to state updates of an entity another entity derives from."""
+        callbacks = self.state_slots[
+            self.async_get_state_slot(state_type, device_id, state_key)
+        ].derived_subscriptions
+        callbacks.append(entity_callback)
+        return partial(callbacks.remove, entity_callback)
+
+    @callback
+    def async_update_state(self, state: EntityState, record: bool = True) -> None:
+        """Distribute an update of state information to the target.
+
+        Replayed states pass record=False so they are not recorded again.
+        """
+        if record and (recorder := self.state_recorder) is not None:
+            recorder.async_record(state)
+        subscription_key = (type(state), state.device_id, state.key)
+        if (index := self.state_slot_index.get(subscription_key)) is None:
+            # States of entities without a platform entity yet
+            index = self.async_get_state_slot(*subscription_key)
+        slot = self.state_slots[index]
+        counters = slot.counters
+        counters.received += 1
+        if slot.disabled and not slot.derived_subscriptions:
+            counters.disabled += 1
+            return
+        generation = self.connection_generation
         if (
-            current_state == state
-            and subscription_key not in stale_state
-            and state_type not in (CameraState, Event)
-            and not (
-                state_type is SensorState
-                and (platform_info := self.info.get(SensorInfo))
-                and (entity_info := platform_info.get((state.device_id, state.key)))
-                and (cast(SensorInfo, entity_info)).force_update
+            slot.generation == generation
+            and not slot.always_dispatch
+            and not slot.filters
+            and (
+                slot.state == state
+                or (
+                    # Sensor noise below the accuracy of the sensor renders
+                    # the same value. Derived entities such as interpolated
+                    # sensors still need the full precision raw value.
+                    (decimals := slot.accuracy_decimals) is not None
+                    and not slot.derived_subscriptions
+                    and _equal_at_accuracy(slot.state, state, decimals)
+                )
             )
         ):
+            counters.deduped += 1
             return
-        stale_state.discard(subscription_key)
-        current_state_by_type[key] = state
-        if subscription := self.state_subscriptions.get(subscription_key):
+        counters.dispatched += 1
+        slot.generation = generation
+        slot.state = state
+        if not self._states_dirty:
+            self._async_schedule_states_save()
+        metrics = self.dispatch_metrics
+        start = time.perf_counter() if metrics.should_sample() else None
+        if subscription := slot.subscription:
             try:
                 subscription()
             except Exception:
                 # If we allow this exception to raise it will
                 # make it all the way to data_received in aioesphomeapi
                 # which will cause the connection to be closed.
+                metrics.callback_errors += 1
                 _LOGGER.exception("Error while calling subscription")
+        if derived_subscriptions := slot.derived_subscriptions:
+            for derived_subscription in derived_subscriptions.copy():
+                try:
+                    derived_subscription()
+                except Exception:
+                    metrics.callback_errors += 1
+                    _LOGGER.exception("Error while calling derived subscription")
+        if start is not None:
+            metrics.record_latency(time.perf_counter() - start)
 
     @callback
     def async_update_device_state(self) -> None:
-        """Distribute an update of a core device state like availability."""
-        for callback_ in self.device_update_subscriptions.copy():
-            callback_()
+        """Distribute an update of a core device state like availability.
+
+        All entities update their availability first, then the entities
+        whose availability changed write their state together in a second
+        pass, whether or not state writes are otherwise coalesced.
+        """
+        self._async_cancel_unavailable_timer()
+        writes = self._device_state_writes = {}
+        try:
+            for callback_ in self.device_update_subscriptions.copy():
+                callback_()
+        finally:
+            self._device_state_writes = None
+        scheduler = self.state_write_scheduler
+        for write_state in writes:
+            if scheduler is not None:
+                # The write below already covers any coalesced write
+                scheduler.async_discard(write_state)
+            try:
+                write_state()
+            except Exception:
+                _LOGGER.exception("Error while writing device state update")
+
+    @callback
+    def async_schedule_device_state_write(self, write_state: CALLBACK_TYPE) -> bool:
+        """Collect a state write for the device state update in progress.
+
+        Returns False if no device state update is being distributed.
+        """
+        if (writes := self._device_state_writes) is None:
+            return False
+        writes[write_state] = None
+        return True
+
+    @callback
+    def async_schedule_device_unavailable(self, grace_period: float) -> None:
+        """Mark the entities unavailable once the grace period has elapsed.
+
+        If the device reconnects before then, the entities never go
+        unavailable.
+        """
+        if grace_period <= 0:
+            self.async_update_device_state()
+            return
+        if self._unavailable_timer is None:
+            self._unavailable_timer = asyncio.get_running_loop().call_later(
+                grace_period, self._async_on_unavailable_timer
+            )
+
+    @callback
+    def _async_on_unavailable_timer(self) -> None:
+        """Mark the entities unavailable if the device is still disconnected."""
+        self._unavailable_timer = None
+        self.restored_states_available = False
+        if not self.available:
+            self.async_update_device_state()
+
+    @callback
+    def _async_cancel_unavailable_timer(self) -> None:
+        """Cancel a pending transition to unavailable."""
+        if self._unavailable_timer is not None:
+            self._unavailable_timer.cancel()
+            self._unavailable_timer = None
 
     async def async_load_from_store(self) -> tuple[list[EntityInfo], list[UserService]]:
         """Load the retained data from store and return de-serialized data."""
@@ -391,6 +1014,16 @@ class RuntimeEntryData:
 
         self.device_info = DeviceInfo.from_dict(restored.pop("device_info"))
         self.api_version = APIVersion.from_dict(restored.pop("api_version", {}))
+        self._stored_device_info = self.device_info
+        self._stored_api_version = self.api_version
+        if (
+            restored_states := await self.states_store.async_load()
+        ) is not None and self._async_restore_states(restored_states["states"]):
+            if self.device_info.has_deep_sleep:
+                # Show the last known states until the device wakes up
+                self.expected_disconnect = True
+            else:
+                self.restored_states_available = True
         infos: list[EntityInfo] = []
         for comp_type, restored_infos in restored.items():
             if TYPE_CHECKING:
@@ -405,39 +1038,133 @@ class RuntimeEntryData:
         ]
         return infos, services
 
+    @callback
+    def _async_restore_states(self, restored_states: list[dict[str, Any]]) -> bool:
+        """Restore the last known states as stale and return if any were.
+
+        The slots keep their initial generation so the first state of
+        the next connection is always dispatched.
+        """
+        restored = False
+        for restored_state in restored_states:
+            try:
+                state = state_from_dict(restored_state)
+            except (KeyError, TypeError, ValueError) as err:
+                _LOGGER.debug("%s: Not restoring state: %s", self.name, err)
+                continue
+            if type(state) is SensorState and not isinstance(
+                cast(SensorState, state).state, (int, float)
+            ):
+                _LOGGER.debug("%s: Not restoring invalid state %s", self.name, state)
+                continue
+            self.state_slots[
+                self.async_get_state_slot(type(state), state.device_id, state.key)
+            ].state = state
+            restored = True
+        return restored
+
+    @callback
+    def async_end_restored_states_available(self) -> None:
+        """Mark the entities showing restored states unavailable."""
+        if self.restored_states_available:
+            self.restored_states_available = False
+            self.async_update_device_state()
+
+    @callback
+    def async_mark_storage_dirty(self, section: str) -> None:
+        """Mark a section of the stored data to be rebuilt on the next save."""
+        self._dirty_storage_sections.add(section)
+
     def async_save_to_store(self) -> None:
-        """Generate dynamic data to store and save it to the filesystem."""
+        """Generate dynamic data to store and save it to the filesystem.
+
+        Only the sections marked dirty, and the device info and API
+        version if they changed, are serialized again.
+        """
         if TYPE_CHECKING:
             assert self.device_info is not None
-        store_data: StoreData = {
-            "device_info": self.device_info.to_dict(),
-            "services": [],
-            "api_version": self.api_version.to_dict(),
-        }
-        for info_type, infos in self.info.items():
-            comp_type = INFO_TO_COMPONENT_TYPE[info_type]
-            store_data[comp_type] = [info.to_dict() for info in infos.values()]  # type: ignore[literal-required]
+        dirty = self._dirty_storage_sections
+        if (previous := self._storage_contents) is None:
+            previous = {}
+            dirty.update(("device_info", "api_version", "services"))
+            dirty.update(INFO_TO_COMPONENT_TYPE[info_type] for info_type in self.info)
+        # Comparing the dataclasses is cheaper than serializing them every time
+        if self.device_info != self._stored_device_info:
+            dirty.add("device_info")
+        if self.api_version != self._stored_api_version:
+            dirty.add("api_version")
+        if not dirty:
+            return
 
-        store_data["services"] = [
-            service.to_dict() for service in self.services.values()
-        ]
-        if store_data == self._storage_contents:
+        store_data = cast(dict[str, Any], previous.copy())
+        for section in dirty:
+            if section == "device_info":
+                self._stored_device_info = self.device_info
+                store_data[section] = self.device_info.to_dict()
+            elif section == "api_version":
+                self._stored_api_version = self.api_version
+                store_data[section] = self.api_version.to_dict()
+            elif section == "services":
+                store_data[section] = [
+                    service.to_dict() for service in self.services.values()
+                ]
+            elif (info_type := COMPONENT_TYPE_TO_INFO.get(section)) in self.info:
+                store_data[section] = [
+                    info.to_dict() for info in self.info[info_type].values()
+                ]
+        changed = any(store_data.get(key) != previous.get(key) for key in dirty)
+        dirty.clear()
+        if not changed:
             return
+        self._storage_contents = cast(StoreData, store_data)
 
         def _memorized_storage() -> StoreData:
             self._pending_storage = None
-            self._storage_contents = store_data
-            return store_data
+            return cast(StoreData, store_data)
 
         self._pending_storage = _memorized_storage
         self.store.async_delay_save(_memorized_storage, SAVE_DELAY)
 
+    @callback
+    def _async_schedule_states_save(self) -> None:
+        """Save a snapshot of the states once the states save delay has passed."""
+        self._states_dirty = True
+        self.states_store.async_delay_save(
+            self._async_snapshot_states, STATES_SAVE_DELAY
+        )
+
+    @callback
+    def _async_snapshot_states(self) -> StatesStoreData:
+        """Return the latest state of each entity to write."""
+        self._states_dirty = False
+        return {
+            "states": [
+                state_to_dict(state)
+                for slot in self.state_slots
+                if (state := slot.state) is not None and type(state) is not CameraState
+            ]
+        }
+
     async def async_cleanup(self) -> None:
         """Cleanup the entry data when disconnected or unloading."""
+        if self._interpolation_flush is not None:
+            self._interpolation_flush.cancel()
+            self._interpolation_flush = None
+        self._pending_interpolations.clear()
+        for build in self._interpolation_model_builds.values():
+            build.cancel()
+        self._interpolation_model_builds.clear()
+        if self.state_write_scheduler is not None:
+            self.state_write_scheduler.async_cancel()
+        self._async_cancel_unavailable_timer()
+        if self.state_recorder is not None:
+            await self.state_recorder.async_flush()
         if self._pending_storage:
             # Ensure we save the data if we are unloading before the
             # save delay has passed.
             await self.store.async_save(self._pending_storage())
+        if self._states_dirty:
+            await self.states_store.async_save(self._async_snapshot_states())
 
     async def async_update_listener(
         self, hass: HomeAssistant, entry: ESPHomeConfigEntry
@@ -471,6 +1198,7 @@ class RuntimeEntryData:
     ) -> None:
         """Call when the entry has been connected."""
         self.available = True
+        self.restored_states_available = False
         if self.bluetooth_device:
             self.bluetooth_device.available = True
 
@@ -0,0 +1,144 @@
+"""Incremental smoothing filters for SmartVan.io sensor streams."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from .const import CONF_EMA_ALPHA, CONF_MEDIAN_WINDOW, CONF_OUTLIER_THRESHOLD
+
+# Number of consecutive rejected samples after which a jump is
+# accepted as a real change in level instead of an outlier.
+MAX_CONSECUTIVE_OUTLIERS = 3
+
+
+class SensorFilter(ABC):
+    """Base class for a filter applied to each new sensor sample."""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def process(self, value: float) -> float | None:
+        """Process a sample and return the filtered value or None to drop it."""
+
+
+class OutlierRejectionFilter(SensorFilter):
+    """Drop samples that jump further than a threshold from the last sample."""
+
+    __slots__ = ("_consecutive", "_last", "threshold")
+
+    def __init__(self, threshold: float) -> None:
+        """Initialize the filter."""
+        self.threshold = threshold
+        self._last: float | None = None
+        self._consecutive = 0
+
+    def process(self, value: float) -> float | None:
+        """Process a sample and return the filtered value or None to drop it."""
+        if (
+            self._last is not None
+            and abs(value - self._last) > self.threshold
+            and self._consecutive < MAX_CONSECUTIVE_OUTLIERS
+        ):
+            self._consecutive += 1
+            return None
+        self._consecutive = 0
+        self._last = value
+        return value
+
+
+class MovingMedianFilter(SensorFilter):
+    """Return the median of the last samples kept in a fixed size window."""
+
+    __slots__ = ("_sorted", "_window")
+
+    def __init__(self, window: int) -> None:
+        """Initialize the filter."""
+        self._window: deque[float] = deque(maxlen=window)
+        self._sorted: list[float] = []
+
+    def process(self, value: float) -> float | None:
+        """Process a sample and return the filtered value or None to drop it."""
+        window = self._window
+        ordered = self._sorted
+        if len(window) == window.maxlen:
+            # The oldest sample is evicted from the ring buffer by the append
+            del ordered[bisect_left(ordered, window[0])]
+        window.append(value)
+        insort(ordered, value)
+        middle, odd = divmod(len(ordered), 2)
+        if odd:
+            return ordered[middle]
+        return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+class ExponentialMovingAverageFilter(SensorFilter):
+    """Return the exponential moving average of the samples."""
+
+    __slots__ = ("_value", "alpha")
+
+    def __init__(self, alpha: float) -> None:
+        """Initialize the filter."""
+        self.alpha = alpha
+        self._value: float | None = None
+
+    def process(self, value: float) -> float | None:
+        """Process a sample and return the filtered value or None to drop it."""
+        if self._value is None:
+            self._value = value
+        else:
+            self._value += self.alpha * (value - self._value)
+        return self._value
+
+
+@dataclass(frozen=True, slots=True)
+class FilterOptions:
+    """Options selecting the filters applied to a sensor."""
+
+    outlier_threshold: float | None = None
+    median_window: int | None = None
+    ema_alpha: float | None = None
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> FilterOptions | None:
+        """Return the filter options or None if filtering is disabled."""
+        outlier_threshold = options.get(CONF_OUTLIER_THRESHOLD) or None
+        median_window = options.get(CONF_MEDIAN_WINDOW) or None
+        ema_alpha = options.get(CONF_EMA_ALPHA) or None
+        if median_window is not None and median_window < 2:
+            median_window = None
+        if ema_alpha is not None and ema_alpha >= 1:
+            ema_alpha = None
+        if outlier_threshold is None and median_window is None and ema_alpha is None:
+            return None
+        return cls(outlier_threshold, median_window, ema_alpha)
+
+
+class SensorFilterChain:
+    """Apply outlier rejection, median and moving average filters in order."""
+
+    __slots__ = ("_filters", "options")
+
+    def __init__(self, options: FilterOptions) -> None:
+        """Initialize the filter chain."""
+        self.options = options
+        filters: list[SensorFilter] = []
+        if options.outlier_threshold is not None:
+            filters.append(OutlierRejectionFilter(options.outlier_threshold))
+        if options.median_window is not None:
+            filters.append(MovingMedianFilter(options.median_window))
+        if options.ema_alpha is not None:
+            filters.append(ExponentialMovingAverageFilter(options.ema_alpha))
+        self._filters = tuple(filters)
+
+    def process(self, value: float) -> float | None:
+        """Process a sample and return the filtered value or None to drop it."""
+        for sensor_filter in self._filters:
+            if (filtered := sensor_filter.process(value)) is None:
+                return None
+            value = filtered
+        return value
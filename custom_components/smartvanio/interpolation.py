@@ -0,0 +1,347 @@
+"""Calibration curve interpolation for SmartVan.io sensors."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+import json
+import math
+from typing import Any, Final, NamedTuple, cast
+
+INTERPOLATION_KIND_LINEAR: Final = "linear"
+INTERPOLATION_KIND_NEAREST: Final = "nearest"
+INTERPOLATION_KIND_PREVIOUS: Final = "previous"
+INTERPOLATION_KIND_NEXT: Final = "next"
+
+# Number of samples in a lookup table built over the calibration range.
+LOOKUP_TABLE_SIZE: Final = 4096
+
+# Minimum number of values sampled at once before NumPy is used.
+VECTORIZE_MIN_SIZE: Final = 8
+
+# Kinds handled by PiecewiseInterpolator without importing SciPy.
+BUILTIN_INTERPOLATION_KINDS: Final = frozenset(
+    {
+        INTERPOLATION_KIND_LINEAR,
+        INTERPOLATION_KIND_NEAREST,
+        INTERPOLATION_KIND_PREVIOUS,
+        INTERPOLATION_KIND_NEXT,
+    }
+)
+
+# Step kinds are already cheap to evaluate and would be smeared
+# by the linear blend between lookup table samples.
+STEP_INTERPOLATION_KINDS: Final = frozenset(
+    {
+        INTERPOLATION_KIND_NEAREST,
+        INTERPOLATION_KIND_PREVIOUS,
+        INTERPOLATION_KIND_NEXT,
+    }
+)
+
+
+class InvalidInterpolationPoints(ValueError):
+    """Raised when interpolation points are not a valid calibration table."""
+
+
+@dataclass(frozen=True, slots=True)
+class CalibrationPoints:
+    """Calibration breakpoints sorted by strictly increasing x."""
+
+    x: tuple[float, ...]
+    y: tuple[float, ...]
+
+
+def _is_number(value: Any) -> bool:
+    """Return if the value is a finite JSON number."""
+    return (
+        isinstance(value, (int, float))
+        and not isinstance(value, bool)
+        and math.isfinite(value)
+    )
+
+
+def parse_interpolation_points(text: str) -> CalibrationPoints:
+    """Parse, validate and sort interpolation points such as [[0, 1], [1.5, 50]].
+
+    Raises InvalidInterpolationPoints if the text is not a list of at
+    least two numeric [x, y] pairs with distinct x values.
+    """
+    try:
+        points = json.loads(text)
+    except ValueError as err:
+        raise InvalidInterpolationPoints(f"Not valid JSON: {err}") from err
+    if not isinstance(points, list) or len(points) < 2:
+        raise InvalidInterpolationPoints("At least two points are required")
+    pairs: list[tuple[float, float]] = []
+    for point in points:
+        if (
+            not isinstance(point, list)
+            or len(point) != 2
+            or not _is_number(point[0])
+            or not _is_number(point[1])
+        ):
+            raise InvalidInterpolationPoints(
+                f"Point {point!r} is not a pair of numbers"
+            )
+        pairs.append((float(point[0]), float(point[1])))
+    pairs.sort()
+    x, y = zip(*pairs, strict=True)
+    for x0, x1 in zip(x, x[1:], strict=False):
+        if x0 == x1:
+            raise InvalidInterpolationPoints(f"Duplicate x value {x0}")
+    return CalibrationPoints(x, y)
+
+
+class _Breakpoints:
+    """Breakpoints of a piecewise linear curve for vectorized evaluation."""
+
+    __slots__ = ("_arrays", "x", "y")
+
+    def __init__(self, x: Sequence[float], y: Sequence[float]) -> None:
+        """Initialize the breakpoints."""
+        self.x = x
+        self.y = y
+        self._arrays: tuple[Any, Any] | None = None
+
+    def interpolate(
+        self, values: Sequence[float], fallback: Callable[[float], float]
+    ) -> list[float]:
+        """Interpolate values between the breakpoints with a single NumPy call.
+
+        Values outside the breakpoints are evaluated with fallback so
+        extrapolation matches the scalar interpolator.
+        """
+        # NumPy is only needed for large batches, so import it lazily
+        import numpy as np
+
+        if (arrays := self._arrays) is None:
+            arrays = self._arrays = (
+                np.asarray(self.x, dtype=float),
+                np.asarray(self.y, dtype=float),
+            )
+        xp, fp = arrays
+        raw = np.asarray(values, dtype=float)
+        results = np.interp(raw, xp, fp)
+        for index in np.flatnonzero((raw < xp[0]) | (raw > xp[-1])).tolist():
+            results[index] = fallback(values[index])
+        return cast(list[float], results.tolist())
+
+
+class PiecewiseInterpolator:
+    """Evaluate a piecewise calibration curve over sorted breakpoints.
+
+    Values outside the breakpoint range are extrapolated from the
+    first or last segment for linear interpolation, and take the first
+    or last value for the step kinds.
+    """
+
+    __slots__ = ("_breakpoints", "_evaluate", "_last", "_slopes", "kind", "x", "y")
+
+    def __init__(self, x: Sequence[float], y: Sequence[float], kind: str) -> None:
+        """Initialize the interpolator from breakpoints sorted by x."""
+        if kind not in BUILTIN_INTERPOLATION_KINDS:
+            raise ValueError(f"Unsupported interpolation kind: {kind}")
+        if len(x) != len(y) or len(x) < 2:
+            raise ValueError("At least two breakpoints are required")
+        self.kind = kind
+        self.x = tuple(map(float, x))
+        self.y = tuple(map(float, y))
+        self._last = len(self.x) - 1
+        self._slopes = tuple(
+            (y1 - y0) / (x1 - x0) if x1 != x0 else 0.0
+            for x0, x1, y0, y1 in zip(
+                self.x, self.x[1:], self.y, self.y[1:], strict=False
+            )
+        )
+        self._evaluate: Callable[[float], float] = getattr(self, f"_{kind}")
+        self._breakpoints = (
+            _Breakpoints(self.x, self.y) if kind == INTERPOLATION_KIND_LINEAR else None
+        )
+
+    def __call__(self, value: float) -> float:
+        """Return the interpolated value."""
+        return self._evaluate(value)
+
+    def sample(self, values: Sequence[float]) -> list[float]:
+        """Return the interpolated values for a sequence of inputs."""
+        if self._breakpoints is not None and len(values) >= VECTORIZE_MIN_SIZE:
+            return self._breakpoints.interpolate(values, self._evaluate)
+        evaluate = self._evaluate
+        return [evaluate(value) for value in values]
+
+    def _segment(self, value: float) -> int:
+        """Return the index of the segment containing or nearest to value."""
+        index = bisect_right(self.x, value) - 1
+        if index < 0:
+            return 0
+        if index >= self._last:
+            return self._last - 1
+        return index
+
+    def _linear(self, value: float) -> float:
+        index = self._segment(value)
+        return self.y[index] + self._slopes[index] * (value - self.x[index])
+
+    def _nearest(self, value: float) -> float:
+        index = self._segment(value)
+        x = self.x
+        # Match SciPy and round down when exactly between two breakpoints
+        if value - x[index] <= x[index + 1] - value:
+            return self.y[index]
+        return self.y[index + 1]
+
+    def _previous(self, value: float) -> float:
+        index = bisect_right(self.x, value) - 1
+        return self.y[index] if index >= 0 else self.y[0]
+
+    def _next(self, value: float) -> float:
+        index = bisect_left(self.x, value)
+        return self.y[index] if index <= self._last else self.y[-1]
+
+
+def _build_scipy_interpolator(
+    x: Sequence[float], y: Sequence[float], kind: str
+) -> _ScipyInterpolator:
+    """Build an interpolator for the kinds only SciPy supports."""
+    # SciPy is expensive to import so only do it once a spline
+    # kind such as quadratic or cubic is actually selected.
+    from scipy.interpolate import interp1d
+
+    return _ScipyInterpolator(interp1d(x, y, kind=kind, fill_value="extrapolate"))
+
+
+class _ScipyInterpolator:
+    """Wrap a SciPy interpolator so it returns plain floats."""
+
+    __slots__ = ("_interpolator",)
+
+    def __init__(self, interpolator: Any) -> None:
+        """Initialize the wrapper."""
+        self._interpolator = interpolator
+
+    def __call__(self, value: float) -> float:
+        """Return the interpolated value."""
+        return float(self._interpolator(value))
+
+    def sample(self, values: Sequence[float]) -> list[float]:
+        """Return the interpolated values for a sequence of inputs."""
+        return cast(list[float], self._interpolator(values).tolist())
+
+
+class LookupTableInterpolator:
+    """Evaluate a calibration curve from samples taken over its range.
+
+    The curve is sampled once at evenly spaced points between the first
+    and last breakpoint, so each reading costs one index calculation and
+    a linear blend between two neighbouring samples regardless of the
+    interpolation kind or the number of breakpoints. Readings outside
+    the calibration range fall back to the underlying interpolator.
+    """
+
+    __slots__ = (
+        "_breakpoints",
+        "_fallback",
+        "_last",
+        "_scale",
+        "table",
+        "x_max",
+        "x_min",
+    )
+
+    def __init__(
+        self,
+        interpolator: _ScipyInterpolator | PiecewiseInterpolator,
+        x_min: float,
+        x_max: float,
+        size: int = LOOKUP_TABLE_SIZE,
+    ) -> None:
+        """Initialize the lookup table by sampling the interpolator."""
+        if x_max <= x_min:
+            raise ValueError("The calibration range must not be empty")
+        step = (x_max - x_min) / (size - 1)
+        samples = [x_min + index * step for index in range(size - 1)]
+        samples.append(x_max)
+        self.table = tuple(interpolator.sample(samples))
+        self.x_min = x_min
+        self.x_max = x_max
+        self._fallback = interpolator
+        self._last = size - 1
+        self._scale = (size - 1) / (x_max - x_min)
+        self._breakpoints = _Breakpoints(samples, self.table)
+
+    def __call__(self, value: float) -> float:
+        """Return the interpolated value."""
+        if not self.x_min <= value <= self.x_max:
+            return self._fallback(value)
+        position = (value - self.x_min) * self._scale
+        index = int(position)
+        if index >= self._last:
+            return self.table[self._last]
+        table = self.table
+        low = table[index]
+        return low + (table[index + 1] - low) * (position - index)
+
+    def sample(self, values: Sequence[float]) -> list[float]:
+        """Return the interpolated values for a sequence of inputs."""
+        if len(values) >= VECTORIZE_MIN_SIZE:
+            return self._breakpoints.interpolate(values, self._fallback)
+        return [self(value) for value in values]
+
+
+type Interpolator = PiecewiseInterpolator | _ScipyInterpolator | LookupTableInterpolator
+
+
+def build_interpolator(
+    x: Sequence[float],
+    y: Sequence[float],
+    kind: str,
+    lookup_table: bool = False,
+) -> Interpolator:
+    """Build an interpolator for breakpoints sorted by x.
+
+    When lookup_table is set, non-step kinds are precomputed into a
+    LookupTableInterpolator over the calibration range.
+    """
+    interpolator: _ScipyInterpolator | PiecewiseInterpolator
+    if kind in BUILTIN_INTERPOLATION_KINDS:
+        interpolator = PiecewiseInterpolator(x, y, kind)
+    else:
+        interpolator = _build_scipy_interpolator(x, y, kind)
+    if not lookup_table or kind in STEP_INTERPOLATION_KINDS or x[-1] <= x[0]:
+        return interpolator
+    return LookupTableInterpolator(interpolator, float(x[0]), float(x[-1]))
+
+
+class InterpolationModel(NamedTuple):
+    """A compiled interpolation model for a set of calibration points."""
+
+    interpolator: Interpolator
+    y_min: float
+    y_max: float
+
+
+# Calibration points, interpolation kind and lookup table mode of a model
+type InterpolationModelKey = tuple[CalibrationPoints, str, bool]
+
+
+def build_interpolation_model(
+    interpolation_points: CalibrationPoints,
+    interpolation_kind: str,
+    lookup_table: bool,
+) -> InterpolationModel:
+    """Build an interpolation model.
+
+    This may run in the executor.
+    """
+    return InterpolationModel(
+        build_interpolator(
+            interpolation_points.x,
+            interpolation_points.y,
+            interpolation_kind,
+            lookup_table,
+        ),
+        min(interpolation_points.y),
+        max(interpolation_points.y),
+    )
@@ -65,7 +65,9 @@ from .const import (
     CONF_ALLOW_SERVICE_CALLS,
     CONF_DEVICE_NAME,
     CONF_SUBSCRIBE_LOGS,
+    CONF_UNAVAILABLE_GRACE_PERIOD,
     DEFAULT_ALLOW_SERVICE_CALLS,
+    DEFAULT_UNAVAILABLE_GRACE_PERIOD,
     DEFAULT_URL,
     DOMAIN,
     PROJECT_URLS,
@@ -536,17 +538,18 @@ class ESPHomeManager:
         entry_data.expected_disconnect = expected_disconnect
         # Mark state as stale so that we will always dispatch
         # the next state update of that type when the device reconnects
-        entry_data.stale_state = {
-            (type(entity_state), key)
-            for state_dict in entry_data.state.values()
-            for key, entity_state in state_dict.items()
-        }
+        entry_data.async_mark_states_stale()
         if not hass.is_stopping:
             # Avoid marking every esphome entity as unavailable on shutdown
             # since it generates a lot of state changed events and database
             # writes when we already know we're shutting down and the state
-            # will be cleared anyway.
-            entry_data.async_update_device_state()
+            # will be cleared anyway. Short disconnects within the grace
+            # period do not mark the entities unavailable at all.
+            entry_data.async_schedule_device_unavailable(
+                self.entry.options.get(
+                    CONF_UNAVAILABLE_GRACE_PERIOD, DEFAULT_UNAVAILABLE_GRACE_PERIOD
+                )
+            )
 
         if Platform.ASSIST_SATELLITE in self.entry_data.loaded_platforms:
             await self.hass.config_entries.async_unload_platforms(
@@ -557,6 +560,9 @@ class ESPHomeManager:
 
     async def on_connect_error(self, err: Exception) -> None:
         """Start reauth flow if appropriate connect error type."""
+        # The restored states are only shown until the device is known
+        # to be unreachable.
+        self.entry_data.async_end_restored_states_available()
         if isinstance(
             err,
             (
@@ -617,6 +623,17 @@ class ESPHomeManager:
             )
         _setup_services(hass, entry_data, services)
 
+        if entry_data.restored_states_available:
+            # Restored states stay available until the first connection
+            # attempt fails or the device does not connect within the
+            # unavailable grace period.
+            if grace_period := entry.options.get(
+                CONF_UNAVAILABLE_GRACE_PERIOD, DEFAULT_UNAVAILABLE_GRACE_PERIOD
+            ):
+                entry_data.async_schedule_device_unavailable(grace_period)
+            else:
+                entry_data.async_end_restored_states_available()
+
         if entry_data.device_info is not None and entry_data.device_info.name:
             reconnect_logic.name = entry_data.device_info.name
             if entry.unique_id is None:
@@ -828,6 +845,8 @@ def _setup_services(
     to_unregister.extend(old_services.values())
 
     entry_data.services = {serv.key: serv for serv in services}
+    if to_register or to_unregister:
+        entry_data.async_mark_storage_dirty("services")
 
     for service in to_unregister:
         service_name = build_service_name(device_info, service)
@@ -0,0 +1,127 @@
+"""State dispatch metrics for SmartVan.io devices."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any, Final
+
+from aioesphomeapi import EntityState
+
+# Time the subscriber callbacks of one in every N dispatched states.
+LATENCY_SAMPLE_INTERVAL: Final = 64
+
+# Upper bounds in seconds of the callback latency histogram buckets,
+# the last bucket counts everything slower.
+LATENCY_BUCKETS: Final = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1)
+
+
+class StateTypeCounters:
+    """Packet counters for one state type."""
+
+    __slots__ = ("deduped", "disabled", "dispatched", "received")
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.received = 0
+        self.deduped = 0
+        self.disabled = 0
+        self.dispatched = 0
+
+
+class DispatchMetrics:
+    """Counters and sampled callback latency of the state dispatcher.
+
+    The counters are plain integer attributes so keeping them up to
+    date costs a few additions per packet.
+    """
+
+    __slots__ = (
+        "_sample_countdown",
+        "by_state_type",
+        "callback_errors",
+        "latency_buckets",
+        "latency_samples",
+        "latency_total",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.by_state_type: dict[type[EntityState], StateTypeCounters] = {}
+        self.callback_errors = 0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_samples = 0
+        self.latency_total = 0.0
+        self._sample_countdown = LATENCY_SAMPLE_INTERVAL
+
+    def counters(self, state_type: type[EntityState]) -> StateTypeCounters:
+        """Return the counters of a state type."""
+        if (counters := self.by_state_type.get(state_type)) is None:
+            counters = self.by_state_type[state_type] = StateTypeCounters()
+        return counters
+
+    def should_sample(self) -> bool:
+        """Return if the callbacks of the current dispatch should be timed."""
+        self._sample_countdown -= 1
+        if self._sample_countdown:
+            return False
+        self._sample_countdown = LATENCY_SAMPLE_INTERVAL
+        return True
+
+    def record_latency(self, seconds: float) -> None:
+        """Record the time the callbacks of a sampled dispatch took."""
+        self.latency_buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.latency_samples += 1
+        self.latency_total += seconds
+
+    @property
+    def received(self) -> int:
+        """Return the number of state packets received."""
+        return sum(counters.received for counters in self.by_state_type.values())
+
+    @property
+    def deduped(self) -> int:
+        """Return the number of state packets dropped as unchanged."""
+        return sum(counters.deduped for counters in self.by_state_type.values())
+
+    @property
+    def disabled(self) -> int:
+        """Return the number of state packets dropped for disabled entities."""
+        return sum(counters.disabled for counters in self.by_state_type.values())
+
+    @property
+    def dispatched(self) -> int:
+        """Return the number of state packets dispatched to subscribers."""
+        return sum(counters.dispatched for counters in self.by_state_type.values())
+
+    @property
+    def mean_latency(self) -> float | None:
+        """Return the mean sampled callback latency in seconds."""
+        if not self.latency_samples:
+            return None
+        return self.latency_total / self.latency_samples
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a JSON serializable dict."""
+        bounds = [*map(str, LATENCY_BUCKETS), "+Inf"]
+        return {
+            "received": self.received,
+            "deduped": self.deduped,
+            "disabled": self.disabled,
+            "dispatched": self.dispatched,
+            "callback_errors": self.callback_errors,
+            "by_state_type": {
+                state_type.__name__: {
+                    "received": counters.received,
+                    "deduped": counters.deduped,
+                    "disabled": counters.disabled,
+                    "dispatched": counters.dispatched,
+                }
+                for state_type, counters in self.by_state_type.items()
+            },
+            "callback_latency": {
+                "sample_interval": LATENCY_SAMPLE_INTERVAL,
+                "samples": self.latency_samples,
+                "mean": self.mean_latency,
+                "buckets": dict(zip(bounds, self.latency_buckets, strict=True)),
+            },
+        }
@@ -0,0 +1,290 @@
+"""Recording and replay of SmartVan.io device state streams.
+
+A recording is an append-only binary log of length-prefixed records.
+Each record starts with a header holding the length of the payload and
+the monotonic time the state was received, followed by the state type
+name and the state fields as msgpack. Recordings are replayed into a
+loaded config entry with the replay_recording service.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterator
+from functools import partial
+from itertools import islice
+import logging
+import math
+from pathlib import Path
+import struct
+import time
+from typing import Any, Final, cast
+
+import aioesphomeapi
+from aioesphomeapi import CameraState, EntityState
+import msgpack
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_CONFIG_ENTRY_ID
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import ATTR_FILENAME, ATTR_SPEED, DOMAIN, SERVICE_REPLAY_RECORDING
+
+_LOGGER = logging.getLogger(__name__)
+
+# Payload length and monotonic timestamp in seconds of each record.
+RECORD_HEADER: Final = struct.Struct("<Id")
+
+# Buffered records are written to disk at this interval in seconds.
+FLUSH_INTERVAL: Final = 5.0
+
+RECORDINGS_DIR: Final = "smartvanio_recordings"
+
+# Records read from disk at a time while replaying.
+REPLAY_CHUNK_SIZE: Final = 1000
+
+# Replaying yields to the event loop after this many states without a delay.
+REPLAY_YIELD_INTERVAL: Final = 100
+
+REPLAY_RECORDING_SCHEMA: Final = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        # A file name in the recordings directory, never a path
+        vol.Required(ATTR_FILENAME): cv.matches_regex(r"^[\w-]+\.bin$"),
+        vol.Optional(ATTR_SPEED, default=1.0): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+    }
+)
+
+
+def state_to_dict(state: EntityState) -> dict[str, Any]:
+    """Return a JSON serializable dict of a state and its type.
+
+    JSON has no NaN or infinity, which sensors report when a reading
+    fails, so non-finite fields are stored as strings and listed.
+    """
+    fields = state.to_dict()
+    data: dict[str, Any] = {"type": type(state).__name__, "state": fields}
+    if non_finite := [
+        name
+        for name, value in fields.items()
+        if isinstance(value, float) and not math.isfinite(value)
+    ]:
+        for name in non_finite:
+            fields[name] = str(fields[name])
+        data["non_finite"] = non_finite
+    return data
+
+
+def state_from_dict(data: dict[str, Any]) -> EntityState:
+    """Return the state of a dict created by state_to_dict.
+
+    Raises ValueError if the state type is unknown.
+    """
+    state_type = _state_type(str(data["type"]))
+    fields = cast(dict[str, Any], data["state"])
+    if non_finite := data.get("non_finite"):
+        fields = fields.copy()
+        for name in non_finite:
+            fields[name] = float(fields[name])
+    return state_type.from_dict(fields)
+
+
+def encode_state(state: EntityState, timestamp: float) -> bytes:
+    """Encode a state as a record.
+
+    The payload is the state type name and the state fields, which
+    msgpack stores natively including non-finite floats.
+    """
+    payload = msgpack.packb((type(state).__name__, state.to_dict()))
+    return RECORD_HEADER.pack(len(payload), timestamp) + payload
+
+
+def decode_state(payload: bytes) -> EntityState:
+    """Decode the payload of a record.
+
+    Raises ValueError if the payload is invalid or the state type is unknown.
+    """
+    try:
+        name, fields = msgpack.unpackb(payload)
+    except (TypeError, ValueError, msgpack.UnpackException) as err:
+        raise ValueError(f"Invalid record: {err}") from err
+    return _state_type(str(name)).from_dict(fields)
+
+
+def _state_type(name: str) -> type[EntityState]:
+    """Return the state type with the given name."""
+    state_type = getattr(aioesphomeapi, name, None)
+    if not isinstance(state_type, type) or not issubclass(state_type, EntityState):
+        raise ValueError(f"Unknown state type {name}")
+    return state_type
+
+
+def read_recording(path: Path) -> Iterator[tuple[float, EntityState]]:
+    """Read the timestamp and state of each record in a recording.
+
+    A record truncated by an interrupted write ends the recording.
+    """
+    with path.open("rb") as recording:
+        while header := recording.read(RECORD_HEADER.size):
+            if len(header) < RECORD_HEADER.size:
+                return
+            length, timestamp = RECORD_HEADER.unpack(header)
+            if len(payload := recording.read(length)) < length:
+                return
+            yield timestamp, decode_state(payload)
+
+
+def _read_chunk(
+    reader: Iterator[tuple[float, EntityState]],
+) -> list[tuple[float, EntityState]]:
+    """Read the next chunk of records of a recording."""
+    return list(islice(reader, REPLAY_CHUNK_SIZE))
+
+
+class StateRecorder:
+    """Append every incoming state to a recording.
+
+    Records are buffered in memory and written in the executor so
+    recording never blocks the event loop on disk I/O. Camera images
+    are not recorded.
+    """
+
+    __slots__ = ("_buffer", "_flush", "_hass", "path")
+
+    def __init__(self, hass: HomeAssistant, path: Path) -> None:
+        """Initialize the recorder."""
+        self._hass = hass
+        self.path = path
+        self._buffer: list[bytes] = []
+        self._flush: asyncio.TimerHandle | None = None
+
+    @callback
+    def async_record(self, state: EntityState) -> None:
+        """Buffer a state to be written to the recording."""
+        if type(state) is CameraState:
+            return
+        self._buffer.append(encode_state(state, time.monotonic()))
+        if self._flush is None:
+            self._flush = self._hass.loop.call_later(
+                FLUSH_INTERVAL, self._async_schedule_write
+            )
+
+    @callback
+    def _async_schedule_write(self) -> None:
+        """Write the buffered records in the executor."""
+        self._flush = None
+        if not self._buffer:
+            return
+        data = b"".join(self._buffer)
+        self._buffer.clear()
+        self._hass.async_add_executor_job(self._write, data)
+
+    def _write(self, data: bytes) -> None:
+        """Append records to the recording."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("ab") as recording:
+                recording.write(data)
+        except OSError as err:
+            _LOGGER.error("Failed to write state recording %s: %s", self.path, err)
+
+    async def async_flush(self) -> None:
+        """Write the buffered records now."""
+        if self._flush is not None:
+            self._flush.cancel()
+            self._flush = None
+        if self._buffer:
+            data = b"".join(self._buffer)
+            self._buffer.clear()
+            await self._hass.async_add_executor_job(self._write, data)
+
+
+async def async_replay_recording(
+    hass: HomeAssistant,
+    path: Path,
+    update_state: Callable[[EntityState], None],
+    speed: float = 1.0,
+) -> int:
+    """Feed a recording to update_state, such as RuntimeEntryData.async_update_state.
+
+    States are replayed with their recorded spacing divided by speed,
+    or as fast as possible when speed is 0. The recording is read in
+    chunks in the executor, and replaying yields to the event loop
+    regularly even when states are not delayed. Returns the number of
+    replayed states.
+    """
+    reader = read_recording(path)
+    loop = hass.loop
+    start = loop.time()
+    first_timestamp: float | None = None
+    replayed = 0
+    undelayed = 0
+    try:
+        while records := await hass.async_add_executor_job(_read_chunk, reader):
+            if first_timestamp is None:
+                first_timestamp = records[0][0]
+            for timestamp, state in records:
+                delay = 0.0
+                if speed > 0:
+                    delay = start + (timestamp - first_timestamp) / speed - loop.time()
+                if delay > 0:
+                    undelayed = 0
+                    await asyncio.sleep(delay)
+                elif (undelayed := undelayed + 1) >= REPLAY_YIELD_INTERVAL:
+                    undelayed = 0
+                    await asyncio.sleep(0)
+                update_state(state)
+                replayed += 1
+    finally:
+        await hass.async_add_executor_job(reader.close)
+    return replayed
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the service replaying a recording into a config entry."""
+
+    async def _async_replay_recording(call: ServiceCall) -> None:
+        """Start replaying a recording in the background."""
+        entry_id: str = call.data[ATTR_CONFIG_ENTRY_ID]
+        if (
+            entry := hass.config_entries.async_get_entry(entry_id)
+        ) is None or entry.domain != DOMAIN:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="entry_not_found",
+                translation_placeholders={"entry_id": entry_id},
+            )
+        if entry.state is not ConfigEntryState.LOADED:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="entry_not_loaded",
+                translation_placeholders={"title": entry.title},
+            )
+        filename: str = call.data[ATTR_FILENAME]
+        path = Path(hass.config.path(RECORDINGS_DIR, filename))
+        if not await hass.async_add_executor_job(path.is_file):
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="recording_not_found",
+                translation_placeholders={"filename": filename},
+            )
+        # Replayed states bypass the recorder so they are not recorded again
+        update_state = partial(entry.runtime_data.async_update_state, record=False)
+        entry.async_create_background_task(
+            hass,
+            async_replay_recording(hass, path, update_state, call.data[ATTR_SPEED]),
+            f"Replay {filename}",
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REPLAY_RECORDING,
+        _async_replay_recording,
+        schema=REPLAY_RECORDING_SCHEMA,
+    )
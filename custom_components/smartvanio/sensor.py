@@ -2,40 +2,140 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from functools import partial
 import math
 import logging
 from datetime import date, datetime
+from typing import Any, cast
 
 from aioesphomeapi import (
     EntityInfo,
+    SelectState,
     SensorInfo,
     SensorState,
     SensorStateClass as EsphomeSensorStateClass,
     TextSensorInfo,
     TextSensorState,
+    TextState,
 )
 from aioesphomeapi.model import LastResetType
-from scipy.interpolate import interp1d
+import voluptuous as vol
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import (
+    device_registry as dr,
+    entity_platform,
+    entity_registry as er,
+)
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.typing import VolDictType
 from homeassistant.util import dt as dt_util
 from homeassistant.util.enum import try_parse_enum
 
-from .entity import EsphomeEntity, platform_async_setup_entry
+from .const import (
+    CONF_DEADBAND,
+    CONF_DEADBAND_TYPE,
+    CONF_EMA_ALPHA,
+    CONF_INTERPOLATION_LOOKUP_TABLE,
+    CONF_MEDIAN_WINDOW,
+    CONF_MIN_INTERVAL,
+    CONF_OUTLIER_THRESHOLD,
+    DEADBAND_TYPE_ABSOLUTE,
+    DEADBAND_TYPE_PERCENT,
+    DEFAULT_INTERPOLATION_LOOKUP_TABLE,
+    DOMAIN,
+    MAX_MEDIAN_WINDOW,
+    SERVICE_SET_SENSOR_OPTIONS,
+)
+from .entity import EsphomeBaseEntity, EsphomeEntity, platform_async_setup_entry
+from .entry_data import CalibrationKeys, RuntimeEntryData
 from .enum_mapper import EsphomeEnumMapper
+from .filters import FilterOptions, SensorFilterChain
+from .interpolation import (
+    BUILTIN_INTERPOLATION_KINDS,
+    CalibrationPoints,
+    InterpolationModel,
+    InterpolationModelKey,
+)
+from .metrics import DispatchMetrics
+from .throttle import StateWriteThrottle, ThrottleOptions
 
 _LOGGER = logging.getLogger(__name__)
 
+SENSOR_OPTIONS_SCHEMA: VolDictType = {
+    vol.Optional(CONF_DEADBAND): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    vol.Optional(CONF_DEADBAND_TYPE): vol.In(
+        [DEADBAND_TYPE_ABSOLUTE, DEADBAND_TYPE_PERCENT]
+    ),
+    vol.Optional(CONF_MIN_INTERVAL): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    vol.Optional(CONF_OUTLIER_THRESHOLD): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    vol.Optional(CONF_MEDIAN_WINDOW): vol.All(
+        vol.Coerce(int), vol.Range(min=0, max=MAX_MEDIAN_WINDOW)
+    ),
+    vol.Optional(CONF_EMA_ALPHA): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+}
+
+
+@dataclass(frozen=True, kw_only=True)
+class EsphomeDispatchMetricSensorEntityDescription(SensorEntityDescription):
+    """Describes a diagnostic sensor reporting state dispatch metrics."""
+
+    value_fn: Callable[[DispatchMetrics], float | None]
+
+
+DISPATCH_METRIC_SENSORS: tuple[EsphomeDispatchMetricSensorEntityDescription, ...] = (
+    EsphomeDispatchMetricSensorEntityDescription(
+        key="packets_received",
+        translation_key="packets_received",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.received,
+    ),
+    EsphomeDispatchMetricSensorEntityDescription(
+        key="packets_deduped",
+        translation_key="packets_deduped",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.deduped,
+    ),
+    EsphomeDispatchMetricSensorEntityDescription(
+        key="packets_dispatched",
+        translation_key="packets_dispatched",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.dispatched,
+    ),
+    EsphomeDispatchMetricSensorEntityDescription(
+        key="callback_errors",
+        translation_key="callback_errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda metrics: metrics.callback_errors,
+    ),
+    EsphomeDispatchMetricSensorEntityDescription(
+        key="callback_latency",
+        translation_key="callback_latency",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        suggested_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=3,
+        value_fn=lambda metrics: metrics.mean_latency,
+    ),
+)
+
+# State types of the raw sensor and calibration entities, in CalibrationKeys order
+_CALIBRATION_STATE_TYPES = (SensorState, TextState, SelectState)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -62,6 +162,16 @@ async def async_setup_entry(
         entity_type=EsphomeTextSensor,
         state_type=TextSensorState,
     )
+    entity_platform.async_get_current_platform().async_register_entity_service(
+        SERVICE_SET_SENSOR_OPTIONS,
+        SENSOR_OPTIONS_SCHEMA,
+        "async_set_sensor_options",
+    )
+    entry_data: RuntimeEntryData = entry.runtime_data
+    async_add_entities(
+        EsphomeDispatchMetricSensor(entry_data, description)
+        for description in DISPATCH_METRIC_SENSORS
+    )
 
 
 _STATE_CLASSES: EsphomeEnumMapper[EsphomeSensorStateClass, SensorStateClass | None] = (
@@ -76,16 +186,60 @@ _STATE_CLASSES: EsphomeEnumMapper[EsphomeSensorStateClass, SensorStateClass | No
 )
 
 
+class _SensorOptionsNotSupportedMixin:
+    """Reject the SmartVan.io sensor options on non-numeric sensors.
+
+    The set_sensor_options service is registered on the whole sensor
+    platform, which also holds these sensors.
+    """
+
+    entity_id: str
+
+    async def async_set_sensor_options(self, **options: Any) -> None:
+        """Raise as the options only apply to numeric sensors."""
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="sensor_options_not_supported",
+            translation_placeholders={"entity_id": self.entity_id},
+        )
+
+
 class EsphomeSensor(EsphomeEntity[SensorInfo, SensorState], SensorEntity):
     """A sensor implementation for esphome."""
 
+    _calibration_keys: CalibrationKeys | None = None
+    _calibration_unsubscribes: list[CALLBACK_TYPE] | None = None
+    _interpolation_cache_key: InterpolationModelKey | None = None
+    _interpolation_model: InterpolationModel | None = None
+    _release_interpolation_model: CALLBACK_TYPE | None = None
+    # The interpolated value, or None until it is calculated again
+    _interpolated: tuple[float | None] | None = None
+    _interpolation_build_key: InterpolationModelKey | None = None
+    _interpolation_build_task: asyncio.Task[None] | None = None
+    _filters: SensorFilterChain | None = None
+    _unsubscribe_state_filter: CALLBACK_TYPE | None = None
+    _filtered_value: float | None = None
+    _throttle: StateWriteThrottle | None = None
+    _throttle_flush: asyncio.TimerHandle | None = None
+    _format_spec: str = ""
+    # The rendered native value along with the state and filtered
+    # value it was rendered from, so each state is only formatted once.
+    _rendered_from: tuple[SensorState, float | None] | None = None
+    _rendered_value: datetime | str | None = None
+    # The native value and availability of the last state write
+    _last_written: tuple[Any, bool] | None = None
+
     @callback
     def _on_static_info_update(self, static_info: EntityInfo) -> None:
         """Set attrs from static info."""
         try:
             super()._on_static_info_update(static_info)
             static_info = self._static_info
+            self._async_update_calibration_keys()
             self._attr_force_update = static_info.force_update
+            self._format_spec = f".{static_info.accuracy_decimals}f"
+            self._rendered_from = None
+            self._interpolated = None
             if unit_of_measurement := static_info.unit_of_measurement:
                 self._attr_native_unit_of_measurement = unit_of_measurement
             self._attr_device_class = try_parse_enum(
@@ -111,125 +265,486 @@ class EsphomeSensor(EsphomeEntity[SensorInfo, SensorState], SensorEntity):
     @property
     def native_value(self) -> datetime | str | None:
         try:
-            if self.entity_id.endswith("interpolated_value"):
-                base_entity_id = self.entity_id.removesuffix(
-                    "_interpolated_value"
-                ).removeprefix("sensor.")
+            if (calibration_keys := self._calibration_keys) is not None:
+                if (interpolated := self._interpolated) is None:
+                    interpolated = self._interpolated = (
+                        self._interpolated_value(calibration_keys),
+                    )
+                return interpolated[0]
 
-                raw_entity_id = f"sensor.{base_entity_id}_raw"
+            if not self._has_state or (state := self._state).missing_state:
+                return None
 
-                interpolation_points_entity_id = (
-                    f"text.{base_entity_id}_interpolation_points"
-                )
+            filtered_value = self._filtered_value
+            if (
+                (rendered_from := self._rendered_from) is not None
+                and rendered_from[0] is state
+                and rendered_from[1] == filtered_value
+            ):
+                return self._rendered_value
 
-                interpolation_kind_entity_id = (
-                    f"select.{base_entity_id}_interpolation_kind"
-                )
+            value = self._render_value(state.state, filtered_value)
+            self._rendered_from = (state, filtered_value)
+            self._rendered_value = value
+            return value
+
+        except Exception as e:
+            _LOGGER.exception("Error in native_value for %s: %s", self.entity_id, e)
+            return None
 
-                raw_value = self.hass.states.get(raw_entity_id).state
+    def _render_value(
+        self, state_float: float, filtered_value: float | None
+    ) -> datetime | str | None:
+        """Render a numeric state with the accuracy of the sensor."""
+        if filtered_value is not None:
+            state_float = filtered_value
 
-                interpolation_points = self.hass.states.get(
-                    interpolation_points_entity_id
-                ).state
+        if not math.isfinite(state_float):
+            return None
 
-                interpolation_kind = self.hass.states.get(
-                    interpolation_kind_entity_id
-                ).state
+        if self.device_class is SensorDeviceClass.TIMESTAMP:
+            return dt_util.utc_from_timestamp(state_float)
 
-                if (
-                    interpolation_kind == "unavailable"
-                    or interpolation_points == "unavailable"
-                ):
-                    return None
+        return format(state_float, self._format_spec)
 
-                return self._interpolate(
-                    raw_value, interpolation_points, interpolation_kind
-                )
+    async def async_added_to_hass(self) -> None:
+        """Register callbacks."""
+        await super().async_added_to_hass()
+        self._async_update_sensor_options()
+        self.async_on_remove(self._async_cancel_throttle_flush)
+        self.async_on_remove(self._async_unsubscribe_filtered_state)
+        self._async_subscribe_calibration()
+        self.async_on_remove(self._async_unsubscribe_calibration)
+        self.async_on_remove(self._async_cancel_interpolation_build)
+        self.async_on_remove(partial(self._async_set_interpolation_model, None, None))
 
-            if not self._has_state or (state := self._state).missing_state:
-                return None
+    @callback
+    def async_registry_entry_updated(self) -> None:
+        """Run when the entity registry entry has been updated."""
+        super().async_registry_entry_updated()
+        self._async_update_sensor_options()
 
-            state_float = state.state
+    async def async_set_sensor_options(self, **options: Any) -> None:
+        """Update the SmartVan.io options of this sensor."""
+        er.async_get(self.hass).async_update_entity_options(
+            self.entity_id, DOMAIN, {**self._sensor_options, **options}
+        )
 
-            if not math.isfinite(state_float):
-                return None
+    @property
+    def _sensor_options(self) -> Mapping[str, Any]:
+        """Return the SmartVan.io options stored in the entity registry."""
+        if (registry_entry := self.registry_entry) is None:
+            return {}
+        return registry_entry.options.get(DOMAIN, {})
+
+    @callback
+    def _async_update_sensor_options(self) -> None:
+        """Apply the SmartVan.io options stored in the entity registry."""
+        throttle_options = ThrottleOptions.from_options(self._sensor_options)
+        if throttle_options is None:
+            self._throttle = None
+            self._async_cancel_throttle_flush()
+        elif self._throttle is None or self._throttle.options != throttle_options:
+            self._throttle = StateWriteThrottle(throttle_options)
+
+        filter_options = FilterOptions.from_options(self._sensor_options)
+        if filter_options is None:
+            self._filters = None
+            self._filtered_value = None
+        elif self._filters is None or self._filters.options != filter_options:
+            # Only a new chain is seeded, an existing chain has already
+            # processed the current state.
+            self._filters = SensorFilterChain(filter_options)
+            self._filtered_value = None
+            self._async_filter_sample()
+        self._interpolated = None
+        self._async_subscribe_filtered_state()
 
-            if self.device_class is SensorDeviceClass.TIMESTAMP:
-                return dt_util.utc_from_timestamp(state_float)
+    @callback
+    def _async_subscribe_filtered_state(self) -> None:
+        """Have the dispatcher pass every sample of the filtered state.
+
+        The filters sample the raw sensor of an interpolated sensor, and
+        the state of the sensor itself otherwise.
+        """
+        self._async_unsubscribe_filtered_state()
+        if self._filters is None:
+            return
+        static_info = self._static_info
+        if (calibration_keys := self._calibration_keys) is not None:
+            state_key = calibration_keys.raw_key
+        else:
+            state_key = static_info.key
+        self._unsubscribe_state_filter = self._entry_data.async_subscribe_state_filter(
+            SensorState, static_info.device_id, state_key
+        )
 
-            return f"{state_float:.{self._static_info.accuracy_decimals}f}"
+    @callback
+    def _async_unsubscribe_filtered_state(self) -> None:
+        """Let the dispatcher deduplicate the filtered state again."""
+        if self._unsubscribe_state_filter is not None:
+            self._unsubscribe_state_filter()
+            self._unsubscribe_state_filter = None
 
-        except Exception as e:
-            _LOGGER.exception("Error in native_value for %s: %s", self.entity_id, e)
-            return None
+    @callback
+    def _on_state_update(self) -> None:
+        """Call when state changed."""
+        self._update_state_from_entry_data()
+        if self._calibration_keys is None:
+            self._async_filter_sample()
+        self._async_write_sensor_state()
 
-    async def async_added_to_hass(self):
-        await super().async_added_to_hass()
+    @callback
+    def _async_on_raw_state_update(self) -> None:
+        """Call when the raw sensor of an interpolated sensor changed.
+
+        When enough sensors share the calibration curve, the raw value
+        is queued on the entry data so their values are interpolated
+        together. Otherwise it is interpolated right away.
+        """
+        self._async_filter_sample()
+        self._interpolated = None
+        if (
+            (calibration_keys := self._calibration_keys) is None
+            or (interpolation_input := self._interpolation_input(calibration_keys))
+            is None
+            or not math.isfinite(raw_value := interpolation_input[0])
+            or (model := self._get_interpolation_model(*interpolation_input[1:]))
+            is None
+            or (model_key := self._interpolation_cache_key) is None
+            or not self._entry_data.async_is_interpolation_batched(model_key)
+        ):
+            self._async_write_sensor_state()
+            return
+        self._entry_data.async_schedule_interpolation(
+            model_key, model.interpolator, raw_value, self._async_on_batch_interpolated
+        )
+
+    @callback
+    def _async_on_batch_interpolated(
+        self, model_key: InterpolationModelKey, raw_value: float, result: float
+    ) -> None:
+        """Write the state once the queued raw value has been interpolated."""
+        if (
+            model_key == self._interpolation_cache_key
+            and (model := self._interpolation_model) is not None
+        ):
+            self._interpolated = (self._apply_model(model, raw_value, result),)
+        self._async_write_sensor_state()
 
-        @callback
-        def _async_sensor_state_changed(event):
-            self.async_schedule_update_ha_state()
-
-        if self.entity_id.endswith("interpolated_value"):
-            self.async_schedule_update_ha_state()
-            base_entity_id = self.entity_id.removesuffix(
-                "_interpolated_value"
-            ).removeprefix("sensor.")
-            async_track_state_change_event(
-                self.hass,
-                [
-                    f"sensor.{base_entity_id}_raw",
-                    f"text.{base_entity_id}_interpolation_points",
-                    f"select.{base_entity_id}_interpolation_kind",
-                ],
-                _async_sensor_state_changed,
+    @callback
+    def _async_on_calibration_update(self) -> None:
+        """Call when the interpolation points or kind changed."""
+        self._interpolated = None
+        self._async_write_sensor_state()
+
+    @callback
+    def _async_filter_sample(self) -> None:
+        """Feed the latest reading through the smoothing filters."""
+        if (filters := self._filters) is None:
+            return
+        state: SensorState | None
+        if (calibration_keys := self._calibration_keys) is not None:
+            state = cast(
+                SensorState | None,
+                self._entry_data.async_get_state(
+                    SensorState,
+                    self._static_info.device_id,
+                    calibration_keys.raw_key,
+                ),
             )
+        else:
+            state = self._state if self._has_state else None
+        if state is None or state.missing_state or not math.isfinite(state.state):
+            return
+        if (value := filters.process(state.state)) is not None:
+            self._filtered_value = value
 
-    def _interpolate(
-        self, raw_value, interpolation_points, interpolation_kind="linear"
-    ):
-        try:
+    @callback
+    def _async_write_sensor_state(self) -> None:
+        """Write the state unless it is held back by the throttle options."""
+        if (throttle := self._throttle) is None:
+            self._async_write_if_changed()
+            return
+        value = self._numeric_native_value()
+        if not throttle.is_significant(value):
+            return
+        loop = self.hass.loop
+        now = loop.time()
+        if (delay := throttle.delay(now)) > 0:
+            # The latest value is written once the interval has elapsed
+            if self._throttle_flush is None:
+                self._throttle_flush = loop.call_later(
+                    delay, self._async_flush_throttled_state
+                )
+            return
+        throttle.record_write(value, now)
+        self._async_write_if_changed()
+
+    @callback
+    def _on_device_update(self) -> None:
+        """Call when device updates or entry data changes."""
+        super()._on_device_update()
+        # The availability may have been written outside of
+        # _async_write_if_changed, so the next state is always written.
+        self._last_written = None
+        if self._throttle is not None:
+            self._throttle.reset()
+
+    @callback
+    def _async_write_if_changed(self) -> None:
+        """Write the state unless the rendered value and availability are unchanged.
+
+        A change below the accuracy of the sensor renders the same
+        value, so there is nothing to write unless force_update is set.
+        """
+        written = (self.native_value, self._attr_available)
+        if written == self._last_written and not self._attr_force_update:
+            return
+        self._last_written = written
+        self._async_schedule_write_ha_state()
+
+    @callback
+    def _async_flush_throttled_state(self) -> None:
+        """Write the latest state after the minimum interval elapsed."""
+        self._throttle_flush = None
+        self._async_write_sensor_state()
+
+    @callback
+    def _async_cancel_throttle_flush(self) -> None:
+        """Cancel a pending throttled state write."""
+        if self._throttle_flush is not None:
+            self._throttle_flush.cancel()
+            self._throttle_flush = None
+
+    def _numeric_native_value(self) -> float | None:
+        """Return the native value as a float if it is numeric."""
+        value = self.native_value
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str):
             try:
-                float(raw_value)
-            except (ValueError, TypeError):
+                return float(value)
+            except ValueError:
                 return None
+        return None
 
-            if raw_value is None:
-                return None
+    @callback
+    def _async_update_calibration_keys(self) -> None:
+        """Update the keys the interpolated value is calculated from."""
+        static_info = self._static_info
+        calibration_keys = self._entry_data.calibration_index.get(
+            (static_info.device_id, static_info.key)
+        )
+        if calibration_keys == self._calibration_keys:
+            return
+        self._calibration_keys = calibration_keys
+        self._interpolated = None
+        if (filters := self._filters) is not None:
+            # The samples of the previous source do not apply to the new one
+            self._filters = SensorFilterChain(filters.options)
+            self._filtered_value = None
+            self._async_filter_sample()
+            self._async_subscribe_filtered_state()
+        if self._calibration_unsubscribes is not None:
+            self._async_unsubscribe_calibration()
+            self._async_subscribe_calibration()
 
-            if not interpolation_points or interpolation_points in (
-                STATE_UNKNOWN,
-                STATE_UNAVAILABLE,
-            ):
-                return None
+    @callback
+    def _async_subscribe_calibration(self) -> None:
+        """Subscribe to the entities the interpolated value is calculated from."""
+        self._calibration_unsubscribes = []
+        if (calibration_keys := self._calibration_keys) is None:
+            return
+        entry_data = self._entry_data
+        device_id = self._static_info.device_id
+        self._calibration_unsubscribes = [
+            entry_data.async_subscribe_derived_state_update(
+                device_id, state_type, key, update_callback
+            )
+            for state_type, key, update_callback in zip(
+                _CALIBRATION_STATE_TYPES,
+                calibration_keys,
+                (
+                    self._async_on_raw_state_update,
+                    self._async_on_calibration_update,
+                    self._async_on_calibration_update,
+                ),
+                strict=True,
+            )
+        ]
 
-            points = json.loads(interpolation_points)
-            if len(points) < 2:
-                return None
+    @callback
+    def _async_unsubscribe_calibration(self) -> None:
+        """Unsubscribe from the entities the interpolated value is calculated from."""
+        if self._calibration_unsubscribes is None:
+            return
+        for unsubscribe in self._calibration_unsubscribes:
+            unsubscribe()
+        self._calibration_unsubscribes = None
+
+    def _interpolated_value(self, calibration_keys: CalibrationKeys) -> float | None:
+        """Return the interpolated value from the raw sensor and calibration."""
+        if (interpolation_input := self._interpolation_input(calibration_keys)) is None:
+            return None
+        return self._interpolate(*interpolation_input)
+
+    def _interpolation_input(
+        self, calibration_keys: CalibrationKeys
+    ) -> tuple[float, CalibrationPoints, str] | None:
+        """Return the raw value, points and kind the sensor is interpolated from."""
+        entry_data = self._entry_data
+        device_id = self._static_info.device_id
+        raw_state = cast(
+            SensorState | None,
+            entry_data.async_get_state(
+                SensorState, device_id, calibration_keys.raw_key
+            ),
+        )
+        kind_state = cast(
+            SelectState | None,
+            entry_data.async_get_state(
+                SelectState, device_id, calibration_keys.kind_key
+            ),
+        )
+        if (
+            raw_state is None
+            or raw_state.missing_state
+            or kind_state is None
+            or kind_state.missing_state
+            or (
+                interpolation_points := entry_data.async_get_interpolation_points(
+                    device_id, calibration_keys.points_key
+                )
+            )
+            is None
+        ):
+            return None
 
-            sorted_points = sorted(points, key=lambda x: x[0])
-            x_vals, y_vals = zip(*sorted_points, strict=False)
+        raw_value = raw_state.state
+        if (filtered_value := self._filtered_value) is not None:
+            raw_value = filtered_value
+
+        return raw_value, interpolation_points, kind_state.state
+
+    def _get_interpolation_model(
+        self, interpolation_points: CalibrationPoints, interpolation_kind: str
+    ) -> InterpolationModel | None:
+        """Return the interpolation model for the given points and kind.
+
+        The model is shared through the entry data by all sensors on the
+        same calibration curve and only looked up again when the
+        interpolation points or kind change. Models that are expensive
+        to build are built in the executor, and the previous model is
+        returned until the new one is ready.
+        """
+        lookup_table: bool = self._entry_data.original_options.get(
+            CONF_INTERPOLATION_LOOKUP_TABLE, DEFAULT_INTERPOLATION_LOOKUP_TABLE
+        )
+        cache_key = (interpolation_points, interpolation_kind, lookup_table)
+        if self._interpolation_cache_key == cache_key:
+            return self._interpolation_model
+
+        entry_data = self._entry_data
+        if cache_key in entry_data.interpolation_models or (
+            interpolation_kind in BUILTIN_INTERPOLATION_KINDS and not lookup_table
+        ):
+            model = entry_data.async_get_interpolation_model(cache_key)
+            self._async_cancel_interpolation_build()
+            self._async_set_interpolation_model(cache_key, model)
+            return model
+
+        if self._interpolation_build_key != cache_key:
+            self._async_cancel_interpolation_build()
+            self._interpolation_build_key = cache_key
+            self._interpolation_build_task = self.hass.async_create_background_task(
+                self._async_build_interpolation_model(cache_key),
+                f"{self.entity_id} interpolation model",
+            )
+        return self._interpolation_model
+
+    async def _async_build_interpolation_model(
+        self, cache_key: InterpolationModelKey
+    ) -> None:
+        """Wait for the model to be built in the executor and write the new state."""
+        model = await self._entry_data.async_build_interpolation_model(
+            self.hass, cache_key
+        )
+        self._interpolation_build_key = None
+        self._interpolation_build_task = None
+        self._async_set_interpolation_model(cache_key, model)
+        self._interpolated = None
+        self._async_write_sensor_state()
 
-            interpolator = interp1d(
-                x_vals,
-                y_vals,
-                kind=interpolation_kind,
-                fill_value="extrapolate",
+    @callback
+    def _async_set_interpolation_model(
+        self,
+        cache_key: InterpolationModelKey | None,
+        model: InterpolationModel | None,
+    ) -> None:
+        """Use a model, counting this sensor as one of its users."""
+        if self._release_interpolation_model is not None:
+            self._release_interpolation_model()
+            self._release_interpolation_model = None
+        if cache_key is not None:
+            self._release_interpolation_model = (
+                self._entry_data.async_use_interpolation_model(cache_key)
             )
+        self._interpolation_cache_key = cache_key
+        self._interpolation_model = model
 
-            interpolated = interpolator(raw_value)
+    @callback
+    def _async_cancel_interpolation_build(self) -> None:
+        """Cancel a pending interpolation model build."""
+        if self._interpolation_build_task is not None:
+            self._interpolation_build_task.cancel()
+            self._interpolation_build_task = None
+        self._interpolation_build_key = None
 
-            y_min = min(y_vals)
-            y_max = max(y_vals)
-            result = max(min(interpolated, y_max), y_min)
+    def _interpolate(
+        self,
+        raw_value: float,
+        interpolation_points: CalibrationPoints,
+        interpolation_kind: str,
+    ) -> float | None:
+        """Return the raw value converted with the calibration curve."""
+        if not math.isfinite(raw_value):
+            return None
 
-            return (int(10 * result - 0.5) + 1) / 10.0
+        if (
+            model := self._get_interpolation_model(
+                interpolation_points, interpolation_kind
+            )
+        ) is None:
+            return None
+        return self._apply_model(model, raw_value)
+
+    def _apply_model(
+        self,
+        model: InterpolationModel,
+        raw_value: float,
+        interpolated: float | None = None,
+    ) -> float | None:
+        """Return the raw value converted with the model, clamped and rounded.
+
+        interpolated is the value a batch already evaluated for raw_value.
+        """
+        try:
+            if interpolated is None:
+                interpolated = model.interpolator(raw_value)
         except Exception as e:
             _LOGGER.exception("Interpolation failed for %s: %s", self.entity_id, e)
-            return raw_value
+            return None
+
+        result = max(min(interpolated, model.y_max), model.y_min)
+        return (int(10 * result - 0.5) + 1) / 10.0
 
 
-class EsphomeTextSensor(EsphomeEntity[TextSensorInfo, TextSensorState], SensorEntity):
+class EsphomeTextSensor(
+    _SensorOptionsNotSupportedMixin,
+    EsphomeEntity[TextSensorInfo, TextSensorState],
+    SensorEntity,
+):
     """A text sensor implementation for ESPHome."""
 
     @callback
@@ -262,3 +777,37 @@ class EsphomeTextSensor(EsphomeEntity[TextSensorInfo, TextSensorState], SensorEn
         except Exception as e:
             _LOGGER.exception("Failed to get native_value for text sensor: %s", e)
             return None
+
+
+class EsphomeDispatchMetricSensor(
+    _SensorOptionsNotSupportedMixin, EsphomeBaseEntity, SensorEntity
+):
+    """A diagnostic sensor reporting the state dispatch metrics of a device."""
+
+    entity_description: EsphomeDispatchMetricSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    # The counters change with every packet so they are polled
+    # instead of writing a state for each packet.
+    _attr_should_poll = True
+
+    def __init__(
+        self,
+        entry_data: RuntimeEntryData,
+        description: EsphomeDispatchMetricSensorEntityDescription,
+    ) -> None:
+        """Initialize the metric sensor."""
+        self.entity_description = description
+        self._entry_data = entry_data
+        assert entry_data.device_info is not None
+        device_info = entry_data.device_info
+        self._device_info = device_info
+        self._attr_unique_id = f"{device_info.mac_address}-{description.key}"
+        self._attr_device_info = DeviceInfo(
+            connections={(dr.CONNECTION_NETWORK_MAC, device_info.mac_address)}
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the value of the metric."""
+        return self.entity_description.value_fn(self._entry_data.dispatch_metrics)
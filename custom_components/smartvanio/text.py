@@ -8,7 +8,9 @@ from aioesphomeapi import EntityInfo, TextInfo, TextMode as EsphomeTextMode, Tex
 
 from homeassistant.components.text import TextEntity, TextMode
 from homeassistant.core import callback
+from homeassistant.exceptions import ServiceValidationError
 
+from .const import DOMAIN, INTERPOLATION_POINTS_SUFFIX
 from .entity import (
     EsphomeEntity,
     convert_api_error_ha_error,
@@ -16,6 +18,7 @@ from .entity import (
     platform_async_setup_entry,
 )
 from .enum_mapper import EsphomeEnumMapper
+from .interpolation import InvalidInterpolationPoints, parse_interpolation_points
 
 TEXT_MODES: EsphomeEnumMapper[EsphomeTextMode, TextMode] = EsphomeEnumMapper(
     {
@@ -28,6 +31,8 @@ TEXT_MODES: EsphomeEnumMapper[EsphomeTextMode, TextMode] = EsphomeEnumMapper(
 class EsphomeText(EsphomeEntity[TextInfo, TextState], TextEntity):
     """A text implementation for esphome."""
 
+    _is_interpolation_points = False
+
     @callback
     def _on_static_info_update(self, static_info: EntityInfo) -> None:
         """Set attrs from static info."""
@@ -37,6 +42,9 @@ class EsphomeText(EsphomeEntity[TextInfo, TextState], TextEntity):
         self._attr_native_max = static_info.max_length
         self._attr_pattern = static_info.pattern
         self._attr_mode = TEXT_MODES.from_esphome(static_info.mode) or TextMode.TEXT
+        self._is_interpolation_points = static_info.object_id.endswith(
+            INTERPOLATION_POINTS_SUFFIX
+        )
 
     @property
     @esphome_state_property
@@ -48,6 +56,15 @@ class EsphomeText(EsphomeEntity[TextInfo, TextState], TextEntity):
     @convert_api_error_ha_error
     async def async_set_value(self, value: str) -> None:
         """Update the current value."""
+        if self._is_interpolation_points:
+            try:
+                parse_interpolation_points(value)
+            except InvalidInterpolationPoints as err:
+                raise ServiceValidationError(
+                    translation_domain=DOMAIN,
+                    translation_key="invalid_interpolation_points",
+                    translation_placeholders={"error": str(err)},
+                ) from err
         self._client.text_command(self._key, value)
 
 
@@ -0,0 +1,74 @@
+"""Throttling of SmartVan.io sensor state writes."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from .const import (
+    CONF_DEADBAND,
+    CONF_DEADBAND_TYPE,
+    CONF_MIN_INTERVAL,
+    DEADBAND_TYPE_PERCENT,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ThrottleOptions:
+    """Options controlling how often a sensor writes its state."""
+
+    deadband: float = 0.0
+    deadband_percent: bool = False
+    min_interval: float = 0.0
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> ThrottleOptions | None:
+        """Return the throttle options or None if throttling is disabled."""
+        deadband = float(options.get(CONF_DEADBAND) or 0.0)
+        min_interval = float(options.get(CONF_MIN_INTERVAL) or 0.0)
+        if deadband <= 0 and min_interval <= 0:
+            return None
+        return cls(
+            deadband=deadband,
+            deadband_percent=options.get(CONF_DEADBAND_TYPE) == DEADBAND_TYPE_PERCENT,
+            min_interval=min_interval,
+        )
+
+
+class StateWriteThrottle:
+    """Decide when a new sensor value is worth writing to the state machine."""
+
+    __slots__ = ("_last_value", "_last_write", "options")
+
+    def __init__(self, options: ThrottleOptions) -> None:
+        """Initialize the throttle."""
+        self.options = options
+        self._last_value: float | None = None
+        self._last_write: float | None = None
+
+    def is_significant(self, value: float | None) -> bool:
+        """Return if the value moved outside the deadband of the last write."""
+        deadband = self.options.deadband
+        last_value = self._last_value
+        if deadband <= 0 or value is None or last_value is None:
+            return True
+        if self.options.deadband_percent:
+            deadband = abs(last_value) * deadband / 100
+        return abs(value - last_value) > deadband
+
+    def delay(self, now: float) -> float:
+        """Return how long to wait before the next write is allowed."""
+        if (last_write := self._last_write) is None:
+            return 0.0
+        return max(0.0, last_write + self.options.min_interval - now)
+
+    def record_write(self, value: float | None, now: float) -> None:
+        """Record that a value was written."""
+        self._last_value = value
+        self._last_write = now
+
+    def reset(self) -> None:
+        """Forget the last write so the next value is always written."""
+        self._last_value = None
+        self._last_write = None
@@ -0,0 +1,66 @@
+"""Coalescing of SmartVan.io entity state writes."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class StateWriteScheduler:
+    """Write the state of each dirty entity once per flush.
+
+    Entities schedule their state write instead of writing right away,
+    and all scheduled writes run together on the next event loop
+    iteration, or once the window has elapsed. An entity scheduled
+    several times before a flush only writes its latest state once.
+    """
+
+    __slots__ = ("_dirty", "_flush", "_loop", "window")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, window: float) -> None:
+        """Initialize the scheduler with the window in seconds."""
+        self._loop = loop
+        self.window = window
+        # Used as an ordered set so entities write in the order they changed
+        self._dirty: dict[CALLBACK_TYPE, None] = {}
+        self._flush: asyncio.Handle | None = None
+
+    @callback
+    def async_schedule(self, write_state: CALLBACK_TYPE) -> None:
+        """Schedule a state write for the next flush."""
+        self._dirty[write_state] = None
+        if self._flush is not None:
+            return
+        if self.window > 0:
+            self._flush = self._loop.call_later(self.window, self._async_flush)
+        else:
+            self._flush = self._loop.call_soon(self._async_flush)
+
+    @callback
+    def async_discard(self, write_state: CALLBACK_TYPE) -> None:
+        """Drop a scheduled state write, such as for a removed entity."""
+        self._dirty.pop(write_state, None)
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel the pending flush and drop all scheduled writes."""
+        if self._flush is not None:
+            self._flush.cancel()
+            self._flush = None
+        self._dirty.clear()
+
+    @callback
+    def _async_flush(self) -> None:
+        """Write the state of all dirty entities."""
+        self._flush = None
+        dirty = self._dirty
+        self._dirty = {}
+        for write_state in dirty:
+            try:
+                write_state()
+            except Exception:
+                _LOGGER.exception("Error while writing coalesced state")